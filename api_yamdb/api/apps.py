@@ -3,3 +3,16 @@ from django.apps import AppConfig
 
 class ApiConfig(AppConfig):
     name = 'api'
+
+    def ready(self):
+        from django.conf import settings
+        from django.core.signals import request_started
+        from django.db.backends.signals import connection_created
+
+        from api_yamdb.db.health import check_connections
+
+        from . import signals  # noqa: F401
+        from .slow_queries import install
+        request_started.connect(check_connections)
+        if settings.SLOW_QUERY_MS:
+            connection_created.connect(install)
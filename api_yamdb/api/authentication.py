@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (AuthenticationFailed,
+                                                 InvalidToken)
+from rest_framework_simplejwt.settings import api_settings
+
+USER_KEY = 'yamdb:auth-user:{}'
+# Поля, которых хватает аутентификации и проверкам прав.
+USER_FIELDS = ('id', 'username', 'role', 'is_staff', 'is_active')
+
+
+def invalidate_user(user_id):
+    cache.delete(USER_KEY.format(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация без запроса пользователя к БД на каждый запрос.
+
+    Поля USER_FIELDS кэшируются на AUTH_USER_CACHE_TIMEOUT секунд и
+    сбрасываются при сохранении или удалении пользователя, см.
+    api.signals. Остальные поля пользователя отложены и догружаются
+    из БД при первом обращении.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # from_db ждёт значения в порядке полей модели.
+        self.field_names = tuple(
+            field.attname for field in self.user_model._meta.concrete_fields
+            if field.attname in USER_FIELDS
+        )
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _('Token contained no recognizable user identification')
+            )
+        key = USER_KEY.format(user_id)
+        values = cache.get(key)
+        if values is None:
+            values = self.user_model.objects.filter(
+                **{api_settings.USER_ID_FIELD: user_id}
+            ).values_list(*self.field_names).first()
+            if values is None:
+                raise AuthenticationFailed(
+                    _('User not found'), code='user_not_found'
+                )
+            cache.set(key, values, settings.AUTH_USER_CACHE_TIMEOUT)
+        user = self.user_model.from_db(
+            self.user_model.objects.db, self.field_names, values
+        )
+        if not user.is_active:
+            raise AuthenticationFailed(
+                _('User is inactive'), code='user_inactive'
+            )
+        return user
@@ -0,0 +1,116 @@
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+BATCH_STATUSES = {
+    (True, False): status.HTTP_201_CREATED,
+    (True, True): status.HTTP_207_MULTI_STATUS,
+    (False, True): status.HTTP_400_BAD_REQUEST,
+}
+CONFLICT_MESSAGE = ('Пакет не сохранён: он противоречит данным, изменённым '
+                    'параллельным запросом. Повторите запрос.')
+
+
+def save_all(model, objs):
+    """Вставляет объекты пачкой, если БД возвращает их id, иначе по одному.
+
+    Без id не связать созданные произведения с жанрами и не отдать их
+    в ответе, поэтому на SQLite объекты сохраняются по очереди.
+    """
+    if connection.features.can_return_ids_from_bulk_insert:
+        model.objects.bulk_create(objs)
+        return
+    for obj in objs:
+        obj.save(force_insert=True)
+
+
+class BatchCreateMixin:
+    """Пакетное создание: список объектов одним запросом.
+
+    Ссылки всего пакета разрешаются заранее в get_batch_context одним
+    запросом на вид, объекты проверяются batch_serializer_class с этим
+    контекстом, а прошедшие проверку вставляет perform_batch_create
+    в одной транзакции. Ответ содержит результат по каждому элементу.
+    Если вставку отклонила БД, например из-за параллельного пакета
+    с теми же уникальными полями, весь пакет отклоняется с ошибкой 400.
+    """
+    batch_serializer_class = None
+
+    def get_batch_context(self, items):
+        return {}
+
+    def perform_batch_create(self, validated):
+        """Создаёт объекты и возвращает их представления по порядку.
+
+        По умолчанию объекты модели batch_serializer_class создаются
+        из проверенных данных как есть, без связей многие-ко-многим.
+        """
+        model = self.batch_serializer_class.Meta.model
+        objs = [model(**data) for data in validated]
+        save_all(model, objs)
+        return self.batch_serializer_class(
+            objs, many=True, context=self.get_serializer_context()
+        ).data
+
+    def save_batch(self, validated):
+        try:
+            with transaction.atomic():
+                return iter(self.perform_batch_create(validated))
+        except IntegrityError:
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [CONFLICT_MESSAGE]}
+            )
+
+    def batch(self, request, *args, **kwargs):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {'detail': 'Ожидается непустой список объектов.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > settings.BATCH_MAX_ITEMS:
+            return Response(
+                {'detail': f'Не больше {settings.BATCH_MAX_ITEMS} '
+                           f'объектов за запрос.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        context = self.get_serializer_context()
+        context.update(self.get_batch_context(items))
+        results = []
+        validated = []
+        for item in items:
+            serializer = self.batch_serializer_class(
+                data=item, context=context
+            )
+            if serializer.is_valid():
+                results.append(None)
+                validated.append(serializer.validated_data)
+            else:
+                results.append({
+                    'status': status.HTTP_400_BAD_REQUEST,
+                    'errors': serializer.errors,
+                })
+        created = self.save_batch(validated) if validated else iter(())
+        results = [
+            result or {
+                'status': status.HTTP_201_CREATED, 'data': next(created)
+            }
+            for result in results
+        ]
+        return Response({'results': results}, status=BATCH_STATUSES[
+            bool(validated), len(validated) < len(items)
+        ])
+
+
+def raw_values(items, field):
+    """Значения поля из сырых элементов пакета, пригодные для запроса."""
+    values = set()
+    for item in items:
+        value = item.get(field) if isinstance(item, dict) else None
+        if isinstance(value, list):
+            values.update(v for v in value if isinstance(v, str))
+        elif isinstance(value, (str, int)):
+            values.add(value)
+    return values
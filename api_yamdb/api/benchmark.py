@@ -0,0 +1,230 @@
+"""Замеры эндпоинтов API в процессе: задержки и число запросов к БД."""
+import time
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.benchmarking import make_vocabulary, percentile
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+# Медленнее базовой линии меньше чем на столько мс - шум, а не регрессия
+MIN_DELTA_MS = 0.5
+
+Route = namedtuple('Route', 'name method path data user')
+
+
+def seed(rng, titles, reviews, comments):
+    """Детерминированный каталог для замеров.
+
+    У первого произведения reviews отзывов, у первого его отзыва
+    comments комментариев - на них меряются глубокие страницы.
+    Возвращает словарь с объектами, на которые ссылаются маршруты.
+    """
+    vocabulary = make_vocabulary(rng, 500)
+    with transaction.atomic():
+        # SQLite не возвращает id из bulk_create, поэтому объекты
+        # перечитываются.
+        Category.objects.bulk_create(
+            Category(name=f'Категория {i}', slug=f'category-{i}')
+            for i in range(10)
+        )
+        categories = list(Category.objects.order_by('pk'))
+        Genre.objects.bulk_create(
+            Genre(name=f'Жанр {i}', slug=f'genre-{i}') for i in range(20)
+        )
+        genres = list(Genre.objects.order_by('pk'))
+        User.objects.bulk_create(
+            User(username=f'user-{i}', email=f'user-{i}@ya.ru',
+                 confirmation_code='code')
+            for i in range(max(reviews, 10))
+        )
+        users = list(User.objects.order_by('pk'))
+        admin = User.objects.create(
+            username='admin', email='admin@ya.ru', role=User.ADMIN
+        )
+        writer = User.objects.create(username='writer', email='w@ya.ru')
+        Title.objects.bulk_create(
+            Title(
+                name=' '.join(rng.choices(vocabulary, k=rng.randint(1, 3))),
+                description=' '.join(rng.choices(vocabulary, k=12)),
+                year=rng.randint(1950, 2021),
+                category=rng.choice(categories),
+            )
+            for _ in range(titles)
+        )
+        title_ids = list(
+            Title.objects.order_by('pk').values_list('pk', flat=True)
+        )
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title_id, genre_id=genre.pk)
+            for title_id in title_ids
+            for genre in rng.sample(genres, rng.randint(1, 3))
+        )
+        Review.objects.bulk_create(
+            Review(title_id=title_id, author=author, text='Отзыв',
+                   score=rng.randint(1, 10))
+            for title_id, count in zip(
+                title_ids, [reviews] + [rng.randint(0, 5) for _ in title_ids]
+            )
+            for author in rng.sample(users, min(count, len(users)))
+        )
+        hot_review = Review.objects.filter(
+            title_id=title_ids[0]
+        ).order_by('pk').first()
+        Comment.objects.bulk_create(
+            Comment(reviews=hot_review, author=rng.choice(users),
+                    text='Комментарий')
+            for _ in range(comments)
+        )
+        Title.objects.rebuild_ratings()
+    return {
+        'title_ids': title_ids,
+        'review': hot_review,
+        'comment': Comment.objects.filter(reviews=hot_review).first(),
+        'word': vocabulary[0],
+        'admin': admin,
+        'reader': users[0],
+        'writer': writer,
+    }
+
+
+def last_page(count):
+    return max(1, -(-count // 10))
+
+
+def get_routes(data, reviews, comments):
+    """Маршруты api/urls.py с параметрами; data - результат seed."""
+    title = data['title_ids'][0]
+    review = data['review'].pk
+    reviews_url = f'/api/v1/titles/{title}/reviews/'
+    comments_url = f'{reviews_url}{review}/comments/'
+    word = data['word']
+    filters = (
+        ('', ''),
+        ('category', 'category=category-1'),
+        ('category, несколько', 'category=category-1,category-2'),
+        ('genre', 'genre=genre-1'),
+        ('genre, несколько', 'genre=genre-1,genre-2'),
+        ('genre_match=all', 'genre=genre-1,genre-2&genre_match=all'),
+        ('category__icontains', 'category__icontains=gory-1'),
+        ('genre__icontains', 'genre__icontains=re-1'),
+        ('name', f'name={word[:3]}'),
+        ('year', 'year=2000'),
+        ('search', f'search={word}'),
+        ('все фильтры', 'category=category-1&genre=genre-1,genre-2'
+                        f'&genre_match=all&year=2000&name={word[:3]}'),
+    )
+    routes = [
+        Route('categories', 'get', '/api/v1/categories/', None, None),
+        Route('genres', 'get', '/api/v1/genres/', None, None),
+    ]
+    routes.extend(
+        Route(f'titles {name}'.strip(), 'get', f'/api/v1/titles/?{query}',
+              None, None)
+        for name, query in filters
+    )
+    routes.append(
+        Route('title', 'get', f'/api/v1/titles/{title}/', None, None)
+    )
+    for name, url, count in (('reviews', reviews_url, reviews),
+                             ('comments', comments_url, comments)):
+        pages = sorted({1, last_page(count) // 2 or 1, last_page(count)})
+        routes.extend(
+            Route(f'{name} page={page}', 'get', f'{url}?page={page}',
+                  None, None)
+            for page in pages
+        )
+        routes.append(Route(
+            f'{name} cursor', 'get', f'{url}?pagination=cursor', None, None
+        ))
+    routes += [
+        Route('review', 'get', f'{reviews_url}{review}/', None, None),
+        Route('comment', 'get', f'{comments_url}{data["comment"].pk}/',
+              None, None),
+        Route('users', 'get', '/api/v1/users/', None, 'admin'),
+        Route('user', 'get', '/api/v1/users/user-1/', None, 'admin'),
+        Route('users/me', 'get', '/api/v1/users/me/', None, 'reader'),
+        Route('export titles', 'get', '/api/v1/export/titles/', None,
+              'admin'),
+        Route('export reviews', 'get', '/api/v1/export/reviews/', None,
+              'admin'),
+        Route('health/db', 'get', '/api/v1/health/db/', None, 'admin'),
+        Route('signup', 'post', '/api/v1/auth/signup/', lambda i: {
+            'username': f'new-{i}', 'email': f'new-{i}@ya.ru'
+        }, None),
+        Route('token', 'post', '/api/v1/auth/token/', lambda i: {
+            'username': data['reader'].username, 'confirmation_code': 'code'
+        }, None),
+        # Каждый раз новое произведение: отзыв на него ещё не писали.
+        Route('review create', 'post', None, lambda i: {
+            'text': 'Новый отзыв', 'score': 7
+        }, 'writer'),
+    ]
+    return routes
+
+
+def make_clients(data):
+    clients = {None: APIClient()}
+    for role in ('admin', 'reader', 'writer'):
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(data[role])}'
+        )
+        clients[role] = client
+    return clients
+
+
+def measure(route, client, data, iterations, warmup, warm_cache=False):
+    """Задержки p50/p95/p99 в мс и наибольшее число запросов к БД."""
+    timings = []
+    queries = 0
+    for i in range(warmup + iterations):
+        if not warm_cache:
+            cache.clear()
+        path = route.path or (
+            f'/api/v1/titles/{data["title_ids"][i + 1]}/reviews/'
+        )
+        payload = route.data(i) if route.data else None
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = getattr(client, route.method)(
+                path, payload, format='json' if payload else None
+            )
+            b''.join(getattr(response, 'streaming_content', ()))
+            elapsed = (time.perf_counter() - started) * 1000
+        if response.status_code >= 400:
+            raise ValueError(
+                f'{route.name}: {route.method.upper()} {path} вернул '
+                f'{response.status_code}'
+            )
+        if i >= warmup:
+            timings.append(elapsed)
+            queries = max(queries, len(captured))
+    return {
+        'p50': round(percentile(timings, 0.5), 3),
+        'p95': round(percentile(timings, 0.95), 3),
+        'p99': round(percentile(timings, 0.99), 3),
+        'queries': queries,
+    }
+
+
+def regressions(results, baseline, tolerance):
+    """Маршруты, где стало больше запросов или p50 вырос сверх допуска."""
+    found = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if result['queries'] > base['queries']:
+            found.append(
+                f'{name}: запросов {base["queries"]} -> {result["queries"]}'
+            )
+        if (result['p50'] > base['p50'] * (1 + tolerance)
+                and result['p50'] - base['p50'] > MIN_DELTA_MS):
+            found.append(
+                f'{name}: p50 {base["p50"]:.2f} -> {result["p50"]:.2f} мс'
+            )
+    return found
@@ -0,0 +1,132 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.http import urlencode
+from rest_framework import filters
+from rest_framework.response import Response
+
+from .sparse import FIELDS_PARAM, OMIT_PARAM, SparseFieldsMixin
+
+VERSION_KEY = 'yamdb:version:{}'
+RESPONSE_KEY = 'yamdb:response:{}:{}:{}'
+# Эти бэкенды не видны другим процессам.
+PROCESS_LOCAL_BACKENDS = (
+    'django.core.cache.backends.dummy.DummyCache',
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+def check_shared_cache():
+    """Не даёт запустить процесс с кэшем, которого не видят другие.
+
+    Версии ресурсов сдвигают процессы веб-сервера, run_workers и команды
+    управления, а читают все процессы веб-сервера: с кэшем в памяти
+    процесса ответы из кэша и 304 по ETag остались бы устаревшими.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if backend in PROCESS_LOCAL_BACKENDS:
+        raise ImproperlyConfigured(
+            f'CACHE_BACKEND={backend} виден только своему процессу. '
+            'Задайте общий кэш, например FileBasedCache с общим для '
+            'всех процессов CACHE_LOCATION или memcached.'
+        )
+
+
+def get_version(resource):
+    """Текущая версия ресурса; меняется при каждой записи в него."""
+    key = VERSION_KEY.format(resource)
+    version = cache.get(key)
+    if version is None:
+        # Ключ мог быть вытеснен: новая версия не должна совпасть со старой.
+        cache.add(key, time.time_ns(), None)
+        return cache.get(key)
+    return version
+
+
+def bump_version(*resources):
+    """Сдвигает версии ресурсов, делая их закэшированные ответы устаревшими."""
+    for resource in resources:
+        key = VERSION_KEY.format(resource)
+        version = cache.get(key) or 0
+        cache.set(key, max(time.time_ns(), version + 1), None)
+
+
+def bump_cached_versions(*resources):
+    """Как bump_version, но только для версий, которые уже есть в кэше.
+
+    Нужно массовым загрузкам: отсутствующая версия и так будет создана
+    заново, а заводить ключ на каждое произведение незачем.
+    """
+    keys = {VERSION_KEY.format(resource): resource for resource in resources}
+    bump_version(*(keys[key] for key in cache.get_many(keys)))
+
+
+class ResponseCacheMixin:
+    """Кэш ответов list для анонимных GET-запросов.
+
+    Ключ строится из версии ресурса cache_resource и нормализованной
+    строки запроса: параметров фильтров, поиска и номера страницы.
+    Запросы с другими параметрами в кэш не попадают.
+    """
+    cache_resource = None
+
+    def get_cache_query_params(self):
+        params = {'format'}
+        filterset_class = getattr(self, 'filterset_class', None)
+        if filterset_class is not None:
+            params.update(filterset_class.base_filters)
+        if filters.SearchFilter in self.filter_backends:
+            params.add(filters.SearchFilter.search_param)
+        if self.paginator is not None:
+            params.add(self.paginator.page_query_param)
+        if issubclass(self.get_serializer_class(), SparseFieldsMixin):
+            params.update((FIELDS_PARAM, OMIT_PARAM))
+        return params
+
+    def get_cache_key(self, request):
+        allowed = self.get_cache_query_params()
+        if not allowed.issuperset(request.query_params):
+            return None
+        query = urlencode(sorted(
+            (name, value)
+            for name in request.query_params
+            for value in request.query_params.getlist(name)
+            if value != ''
+        ))
+        digest = hashlib.md5('|'.join((
+            request.build_absolute_uri(request.path),
+            self.action,
+            query,
+        )).encode()).hexdigest()
+        return RESPONSE_KEY.format(
+            self.cache_resource, get_version(self.cache_resource), digest
+        )
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        key = self.get_cache_key(request)
+        if key is None:
+            return handler(request, *args, **kwargs)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+
+class CachedRetrieveMixin(ResponseCacheMixin):
+    """Кэширует ещё и ответы retrieve."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
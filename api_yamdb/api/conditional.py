@@ -0,0 +1,68 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_version
+
+
+def version_validators(resource):
+    """Валидаторы по версии ресурса: версия хранит время записи в нс."""
+    version = get_version(resource)
+    return f'{resource}:{version}', version // 10 ** 9
+
+
+class ConditionalGetMixin:
+    """ETag и Last-Modified для list и retrieve.
+
+    Валидаторы берутся из дешёвых отметок версий, которые возвращает
+    get_validators(), а не из отрендеренного ответа: на If-None-Match и
+    If-Modified-Since отвечаем 304 без сериализации.
+    """
+    validators_resource = None
+
+    def get_validators(self):
+        """Пара (отметка версии, время изменения в секундах) или None.
+
+        По умолчанию - версия ресурса validators_resource. Без
+        валидаторов запрос обрабатывается как обычно.
+        """
+        if self.validators_resource is None:
+            return None
+        return version_validators(self.validators_resource)
+
+    def get_etag(self, request, stamp):
+        source = '|'.join((
+            stamp,
+            request.get_full_path(),
+            request.accepted_media_type,
+        ))
+        return quote_etag(hashlib.md5(source.encode()).hexdigest())
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        validators = self.get_validators()
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        stamp, last_modified = validators
+        # HTTP-даты точны до секунды.
+        last_modified = int(last_modified)
+        etag = self.get_etag(request, stamp)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
@@ -1,16 +1,59 @@
+from django.db.models import Count
 from django_filters import rest_framework as df_filters
-from reviews.models import Title
+from reviews.models import Category, Title
+
+GENRE_MATCH_CHOICES = (
+    ('any', 'любой из жанров'),
+    ('all', 'все жанры сразу'),
+)
+
+
+class CharInFilter(df_filters.BaseInFilter, df_filters.CharFilter):
+    """Несколько значений через запятую: ?genre=drama,comedy."""
 
 
 class TitleFilter(df_filters.FilterSet):
     """Фильтр по полям произведений."""
-    category = df_filters.CharFilter(field_name='category__slug',
-                                     lookup_expr='icontains')
-    genre = df_filters.CharFilter(field_name="genre__slug",
-                                  lookup_expr='icontains')
+    category = CharInFilter(method='filter_category')
+    genre = CharInFilter(method='filter_genre')
+    genre_match = df_filters.ChoiceFilter(
+        choices=GENRE_MATCH_CHOICES, method='filter_genre_match'
+    )
+    category__icontains = df_filters.CharFilter(
+        field_name='category__slug', lookup_expr='icontains'
+    )
+    genre__icontains = df_filters.CharFilter(
+        field_name='genre__slug', lookup_expr='icontains', distinct=True
+    )
     name = df_filters.CharFilter(field_name='name', lookup_expr='icontains')
     year = df_filters.NumberFilter
+    search = df_filters.CharFilter(method='filter_search')
 
     class Meta:
         model = Title
-        fields = ('category', 'genre', 'name', 'year')
+        fields = ('category', 'genre', 'genre_match', 'category__icontains',
+                  'genre__icontains', 'name', 'year', 'search')
+
+    def filter_category(self, queryset, name, value):
+        return queryset.filter(category__in=Category.objects.filter(
+            slug__in=value
+        ).values('pk'))
+
+    def filter_genre(self, queryset, name, value):
+        # Полусоединение по таблице связей: строки не дублируются.
+        links = Title.genre.through.objects.filter(
+            genre__slug__in=value
+        ).values('title_id')
+        slugs = set(value)
+        if self.form.cleaned_data.get('genre_match') == 'all':
+            links = links.annotate(
+                genres=Count('genre_id', distinct=True)
+            ).filter(genres=len(slugs)).values('title_id')
+        return queryset.filter(pk__in=links)
+
+    def filter_genre_match(self, queryset, name, value):
+        # Режим учитывается в filter_genre.
+        return queryset
+
+    def filter_search(self, queryset, name, value):
+        return queryset.search(value)
@@ -0,0 +1,143 @@
+import json
+import os
+import random
+
+from api import benchmark
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (override_settings, setup_test_environment,
+                               teardown_test_environment)
+
+# Замер чистит кэш и кладёт в него пользователей тестовой базы: общий
+# кэш сервера, его версии ресурсов и корзины ограничений не трогаем.
+BENCHMARK_CACHES = {'default': {
+    'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    'LOCATION': 'yamdb-benchmark',
+}}
+
+
+class Command(BaseCommand):
+    help = ('Замеряет задержки и число запросов к БД на маршрутах API. '
+            'Данные создаются в отдельной тестовой базе, как у manage.py '
+            'test, и удаляются после замера.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument(
+            '--reviews', type=int, default=300,
+            help='Отзывов у произведения, на котором меряются страницы.'
+        )
+        parser.add_argument(
+            '--comments', type=int, default=300,
+            help='Комментариев у отзыва, на котором меряются страницы.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--route', action='append', default=[],
+            help='Мерить только маршруты, в имени которых есть подстрока.'
+        )
+        parser.add_argument(
+            '--baseline',
+            help='JSON с прошлым замером: регрессия завершит команду '
+                 'с ошибкой.'
+        )
+        parser.add_argument(
+            '--save', action='store_true',
+            help='Записать результат в --baseline.'
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25,
+            help='Допустимый рост p50 относительно базовой линии.'
+        )
+        parser.add_argument(
+            '--warm-cache', action='store_true',
+            help='Не очищать кэш перед запросами.'
+        )
+
+    def handle(self, *args, **options):
+        if options['titles'] <= options['iterations'] + options['warmup']:
+            raise CommandError(
+                '--titles должно быть больше --iterations + --warmup: '
+                'каждый отзыв создаётся к новому произведению.'
+            )
+        if options['save'] and not options['baseline']:
+            raise CommandError('--save требует --baseline.')
+        baseline = self.load_baseline(options)
+        with override_settings(CACHES=BENCHMARK_CACHES, REST_FRAMEWORK=dict(
+            settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={}
+        )):
+            results = self.run_on_test_db(options)
+        if options['save']:
+            with open(options['baseline'], 'w', encoding='utf-8') as output:
+                json.dump({
+                    'vendor': connection.vendor,
+                    'routes': results,
+                }, output, ensure_ascii=False, indent=2)
+            self.stdout.write(f'Сохранено в {options["baseline"]}')
+        elif baseline is not None:
+            found = benchmark.regressions(
+                results, baseline['routes'], options['tolerance']
+            )
+            if found:
+                raise CommandError('Регрессии:\n' + '\n'.join(found))
+            self.stdout.write('Регрессий нет.')
+
+    def load_baseline(self, options):
+        path = options['baseline']
+        if options['save'] or not path or not os.path.exists(path):
+            return None
+        with open(path, encoding='utf-8') as source:
+            baseline = json.load(source)
+        if baseline['vendor'] != connection.vendor:
+            raise CommandError(
+                f'Базовая линия снята на {baseline["vendor"]}, '
+                f'а база - {connection.vendor}.'
+            )
+        return baseline
+
+    def run_on_test_db(self, options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            return self.run(options)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def run(self, options):
+        data = benchmark.seed(
+            random.Random(options['seed']), options['titles'],
+            options['reviews'], options['comments']
+        )
+        clients = benchmark.make_clients(data)
+        routes = benchmark.get_routes(
+            data, options['reviews'], options['comments']
+        )
+        self.stdout.write(
+            f'{"маршрут":<28} {"p50, мс":>9} {"p95, мс":>9} {"p99, мс":>9} '
+            f'{"запросы":>8}'
+        )
+        results = {}
+        for route in routes:
+            if options['route'] and not any(
+                    part in route.name for part in options['route']):
+                continue
+            try:
+                result = benchmark.measure(
+                    route, clients[route.user], data, options['iterations'],
+                    options['warmup'], options['warm_cache']
+                )
+            except ValueError as error:
+                raise CommandError(error)
+            results[route.name] = result
+            self.stdout.write(
+                f'{route.name:<28} {result["p50"]:>9.2f} '
+                f'{result["p95"]:>9.2f} {result["p99"]:>9.2f} '
+                f'{result["queries"]:>8}'
+            )
+        return results
@@ -0,0 +1,71 @@
+import io
+import time
+
+from api.renderers import (FastJSONParser, FastJSONRenderer, MessagePackParser,
+                           MessagePackRenderer)
+from api.serializers import ReviewSerializer, TitleSerializer
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from reviews.benchmarking import percentile
+from reviews.models import Review, Title
+
+FORMATS = (
+    ('DRF json', JSONRenderer, JSONParser),
+    ('orjson', FastJSONRenderer, FastJSONParser),
+    ('msgpack', MessagePackRenderer, MessagePackParser),
+)
+
+
+def timed(func, iterations):
+    """Медиана времени вызова func, мкс."""
+    times = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - started) * 1e6)
+    return percentile(times, 0.5)
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время кодирования и размер страницы произведений '
+            'и отзывов из текущей базы в JSON DRF, orjson и MessagePack.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=100,
+                            help='Объектов на странице.')
+        parser.add_argument('--iterations', type=int, default=500)
+
+    def handle(self, *args, **options):
+        items = options['items']
+        titles = Title.objects.select_related('category').prefetch_related(
+            'genre').order_by('pk')[:items]
+        title = Title.objects.annotate(count=Count('reviews')).order_by(
+            '-count').first()
+        if title is None:
+            raise CommandError('В базе нет произведений: заполните её, '
+                               'например командой generate_dataset.')
+        reviews = Review.objects.filter(title=title).select_related(
+            'author').order_by('pk')[:items]
+        for name, data in (
+            ('titles', TitleSerializer(titles, many=True).data),
+            ('reviews', ReviewSerializer(reviews, many=True).data),
+        ):
+            self.stdout.write(f'{name}: {len(data)} объектов')
+            self.stdout.write(
+                f'  {"формат":10} {"байт":>8} {"кодирование, мкс":>18} '
+                f'{"разбор, мкс":>13}'
+            )
+            for label, renderer_class, parser_class in FORMATS:
+                self.compare(label, renderer_class(), parser_class(), data,
+                             options['iterations'])
+
+    def compare(self, label, renderer, parser, data, iterations):
+        content = renderer.render(data)
+        encode = timed(lambda: renderer.render(data), iterations)
+        decode = timed(lambda: parser.parse(io.BytesIO(content)),
+                       iterations)
+        self.stdout.write(
+            f'  {label:10} {len(content):>8} {encode:>18.1f} {decode:>13.1f}'
+        )
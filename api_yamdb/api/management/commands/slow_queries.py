@@ -0,0 +1,98 @@
+import json
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from reviews.benchmarking import percentile
+
+ORDERS = ('total', 'count', 'p95', 'max')
+
+
+def summarize(entries):
+    """Записи журнала, сгруппированные по отпечатку SQL."""
+    groups = {}
+    for entry in entries:
+        group = groups.setdefault(entry['fingerprint'], {
+            'fingerprint': entry['fingerprint'],
+            'normalized': entry['normalized'],
+            'durations': [],
+            'views': Counter(),
+            'errors': 0,
+            'plan': None,
+            'example': None,
+        })
+        group['durations'].append(entry['duration_ms'])
+        group['views'][entry.get('view') or '-'] += 1
+        group['errors'] += bool(entry.get('error'))
+        if entry.get('plan'):
+            group['plan'] = entry['plan']
+        if (group['example'] is None
+                or entry['duration_ms'] > group['example']['duration_ms']):
+            group['example'] = entry
+    for group in groups.values():
+        durations = group['durations']
+        group.update(
+            count=len(durations),
+            total=sum(durations),
+            p95=percentile(durations, 0.95),
+            max=max(durations),
+        )
+    return list(groups.values())
+
+
+class Command(BaseCommand):
+    help = ('Сводка журнала медленных запросов (SLOW_QUERY_LOG): '
+            'худшие отпечатки SQL, их представления и планы.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--log', default=None,
+                            help='Файл журнала, по умолчанию SLOW_QUERY_LOG.')
+        parser.add_argument('--top', type=int, default=10)
+        parser.add_argument('--order', choices=ORDERS, default='total',
+                            help='Сортировка: суммарное время, число, '
+                                 'p95 или максимум.')
+        parser.add_argument('--view', help='Только запросы представлений, '
+                                           'в имени которых есть подстрока.')
+        parser.add_argument('--plans', action='store_true',
+                            help='Показать последний план и самый долгий '
+                                 'пример с параметрами.')
+
+    def handle(self, *args, **options):
+        path = options['log'] or settings.SLOW_QUERY_LOG
+        try:
+            with open(path, encoding='utf-8') as source:
+                entries = [json.loads(line) for line in source if line.strip()]
+        except FileNotFoundError:
+            raise CommandError(f'Журнала {path} нет: включите SLOW_QUERY_MS.')
+        if options['view']:
+            entries = [
+                entry for entry in entries
+                if options['view'] in (entry.get('view') or '')
+            ]
+        groups = sorted(summarize(entries), key=lambda group: group[
+            options['order']], reverse=True)[:options['top']]
+        self.stdout.write(f'Записей: {len(entries)}, отпечатков показано: '
+                          f'{len(groups)}')
+        for group in groups:
+            self.write_group(group, options['plans'])
+
+    def write_group(self, group, plans):
+        views = ', '.join(
+            f'{view} ({count})'
+            for view, count in group['views'].most_common(3)
+        )
+        self.stdout.write(
+            f'\n{group["fingerprint"]}: {group["count"]} раз, всего '
+            f'{group["total"]:.0f} мс, p95 {group["p95"]:.1f} мс, макс '
+            f'{group["max"]:.1f} мс, ошибок {group["errors"]}'
+        )
+        self.stdout.write(f'  представления: {views}')
+        self.stdout.write(f'  {group["normalized"][:500]}')
+        if not plans:
+            return
+        example = group['example']
+        self.stdout.write(f'  пример, {example["duration_ms"]:.1f} мс: '
+                          f'{example["params"]}')
+        if group['plan']:
+            for line in group['plan'].splitlines():
+                self.stdout.write(f'    {line}')
@@ -0,0 +1,356 @@
+"""Метрики представлений в текстовом формате Prometheus.
+
+Каждый процесс копит счётчики и гистограммы в памяти. Процессы
+веб-сервера (см. start_serving) раз в METRICS_FLUSH_INTERVAL секунд
+записывают снимок в METRICS_DIR/<pid>-<случайная часть>.json, тесты и
+команды manage.py снимков не пишут. /metrics складывает снимки всех
+процессов, поэтому при нескольких воркерах gunicorn ответ не зависит от
+того, какой из них его отдал. Снимки завершившихся процессов остаются,
+чтобы счётчики не убывали, пока не устареют на METRICS_SNAPSHOT_MAX_AGE
+секунд: их удаляет следующий запущенный процесс веб-сервера.
+"""
+import atexit
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from api_yamdb.db.health import COUNTERS
+from api_yamdb.db.pool import pool_stats
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+METRICS = {
+    'yamdb_requests_total': (
+        'counter', 'Запросы по представлению и статусу ответа.', None),
+    'yamdb_request_duration_seconds': (
+        'histogram', 'Время ответа, для потоковых - до конца потока.',
+        LATENCY_BUCKETS),
+    'yamdb_db_queries': (
+        'histogram', 'Число SQL-запросов на запрос.', QUERY_BUCKETS),
+    'yamdb_db_duration_seconds': (
+        'histogram', 'Время в SQL-запросах на запрос.', LATENCY_BUCKETS),
+    'yamdb_serialization_duration_seconds': (
+        'histogram', 'Время сериализаторов и рендеринга ответа.',
+        LATENCY_BUCKETS),
+    'yamdb_response_size_bytes': (
+        'histogram', 'Размер тела ответа.', SIZE_BUCKETS),
+    'yamdb_db_health_total': (
+        'counter', 'Проверки соединений перед запросом, см. api_yamdb.db.',
+        None),
+    'yamdb_db_pool_total': (
+        'counter', 'Счётчики пула соединений, см. api_yamdb.db.', None),
+}
+
+LOCAL = threading.local()
+
+
+class Registry:
+    """Метрики процесса: значения по паре (имя, метки).
+
+    У счётчика значение - число, у гистограммы - список: число
+    наблюдений в каждой корзине (не накопительно), затем сумма и
+    количество.
+    """
+
+    def __init__(self):
+        self.values = {}
+        self.lock = threading.Lock()
+        self.flushed = 0
+        self.serving = False
+        self.pid = None
+        self.name = None
+
+    # inc и observe вызываются под self.lock: запрос записывает все свои
+    # метрики за одну блокировку.
+
+    def inc(self, name, labels, value=1):
+        key = (name, labels)
+        self.values[key] = self.values.get(key, 0) + value
+
+    def observe(self, name, labels, value):
+        buckets = METRICS[name][2]
+        key = (name, labels)
+        counts = self.values.get(key)
+        if counts is None:
+            counts = self.values[key] = [0] * (len(buckets) + 3)
+        counts[bisect_left(buckets, value)] += 1
+        counts[-2] += value
+        counts[-1] += 1
+
+    def snapshot(self):
+        """Значения вместе со счётчиками соединений с БД процесса."""
+        with self.lock:
+            series = [
+                [name, list(labels), value if isinstance(value, (int, float))
+                 else list(value)]
+                for (name, labels), value in self.values.items()
+            ]
+        series += [
+            ['yamdb_db_health_total', [['event', event]], value]
+            for event, value in COUNTERS.items()
+        ]
+        series += [
+            ['yamdb_db_pool_total', [['database', database], ['event', event]],
+             value]
+            for database, stats in pool_stats().items()
+            for event, value in stats.items()
+            if event not in ('size', 'idle', 'max_size')
+        ]
+        return series
+
+    def snapshot_name(self):
+        # Случайная часть имени: процесс, получивший pid завершившегося,
+        # не затрёт его снимок. После fork имя у процесса своё.
+        pid = os.getpid()
+        if self.pid != pid:
+            self.pid = pid
+            self.name = f'{pid}-{uuid.uuid4().hex}.json'
+        return self.name
+
+    def flush(self, force=False):
+        directory = settings.METRICS_DIR
+        now = time.monotonic()
+        if not self.serving or not directory or (
+                not force and now - self.flushed
+                < settings.METRICS_FLUSH_INTERVAL):
+            return
+        self.flushed = now
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, self.snapshot_name())
+        # Запись через переименование: читатель не увидит половину файла.
+        temporary = f'{path}.{threading.get_ident()}.tmp'
+        with open(temporary, 'w') as output:
+            json.dump(self.snapshot(), output)
+        os.replace(temporary, path)
+
+
+REGISTRY = Registry()
+
+
+def prune_snapshots():
+    """Удаляет снимки, не обновлявшиеся METRICS_SNAPSHOT_MAX_AGE секунд.
+
+    Работающий процесс, чей снимок удалён после долгого простоя,
+    запишет его заново при следующем сбросе: значения он держит в памяти.
+    """
+    directory = settings.METRICS_DIR
+    if not directory or not os.path.isdir(directory):
+        return
+    stale = time.time() - settings.METRICS_SNAPSHOT_MAX_AGE
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < stale:
+                os.remove(path)
+        except OSError:
+            continue
+
+
+def start_serving():
+    """Включает снимки метрик в процессе веб-сервера, см. wsgi.py."""
+    prune_snapshots()
+    REGISTRY.serving = True
+    atexit.register(REGISTRY.flush, force=True)
+
+
+def collect():
+    """Снимки всех процессов, сложенные по (имя, метки)."""
+    directory = settings.METRICS_DIR
+    # Свой снимок берётся из памяти: файл мог отстать.
+    snapshots = [REGISTRY.snapshot()]
+    if directory and os.path.isdir(directory):
+        for name in os.listdir(directory):
+            if (not name.endswith('.json')
+                    or name == REGISTRY.snapshot_name()):
+                continue
+            try:
+                with open(os.path.join(directory, name)) as source:
+                    snapshots.append(json.load(source))
+            except (OSError, ValueError):
+                continue
+    merged = {}
+    for series in snapshots:
+        for name, labels, value in series:
+            key = (name, tuple(tuple(label) for label in labels))
+            if key not in merged:
+                merged[key] = value
+            elif isinstance(value, list):
+                merged[key] = [a + b for a, b in zip(merged[key], value)]
+            else:
+                merged[key] += value
+    return merged
+
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        '{}="{}"'.format(name, str(value).replace('\\', '\\\\')
+                         .replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    ) + '}'
+
+
+def render(merged):
+    """Текстовый формат Prometheus 0.0.4."""
+    lines = []
+    for name, (kind, description, buckets) in METRICS.items():
+        series = sorted(
+            (labels, value) for (metric, labels), value in merged.items()
+            if metric == name
+        )
+        if not series:
+            continue
+        lines.append(f'# HELP {name} {description}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in series:
+            if kind == 'counter':
+                lines.append(f'{name}{format_labels(labels)} {value}')
+                continue
+            total = 0
+            for bound, count in zip(buckets + ('+Inf',), value):
+                total += count
+                lines.append(f'{name}_bucket'
+                             f'{format_labels(labels, [("le", bound)])} '
+                             f'{total}')
+            lines.append(f'{name}_sum{format_labels(labels)} {value[-2]}')
+            lines.append(f'{name}_count{format_labels(labels)} {value[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+def view_name(request):
+    """TitleViewSet.list, create_user.post; без маршрута - unresolved."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    func = match.func
+    method = request.method.lower()
+    actions = getattr(func, 'actions', None)
+    if actions:
+        return f'{func.cls.__name__}.{actions.get(method, method)}'
+    cls = getattr(func, 'cls', None)
+    if cls is not None:
+        return f'{cls.__name__}.{method}'
+    return match.view_name or func.__name__
+
+
+class RequestStats:
+    """Счётчики одного запроса; заодно execute_wrapper для SQL."""
+
+    def __init__(self, request):
+        self.request = request
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0
+        self.serialization = 0
+        self.serializing = False
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_time += time.perf_counter() - started
+
+    @contextmanager
+    def watch_queries(self):
+        # То же, что execute_wrapper, без вложенных менеджеров контекста.
+        watched = connections.all()
+        for connection in watched:
+            connection.execute_wrappers.append(self)
+        try:
+            yield
+        finally:
+            for connection in watched:
+                connection.execute_wrappers.remove(self)
+
+    def record(self, request, status_code, size):
+        duration = time.perf_counter() - self.started
+        view = (('view', view_name(request)),)
+        with REGISTRY.lock:
+            REGISTRY.inc('yamdb_requests_total',
+                         view + (('status', str(status_code)),))
+            REGISTRY.observe('yamdb_request_duration_seconds', view, duration)
+            REGISTRY.observe('yamdb_db_queries', view, self.queries)
+            REGISTRY.observe('yamdb_db_duration_seconds', view, self.db_time)
+            REGISTRY.observe('yamdb_serialization_duration_seconds', view,
+                             self.serialization)
+            REGISTRY.observe('yamdb_response_size_bytes', view, size)
+        REGISTRY.flush()
+
+
+class MetricsMiddleware:
+    """Снимает метрики запроса, см. модуль. Ставится первым в MIDDLEWARE."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        stats = LOCAL.stats = RequestStats(request)
+        try:
+            with stats.watch_queries():
+                response = self.get_response(request)
+        finally:
+            LOCAL.stats = None
+        if response.streaming:
+            response.streaming_content = self.stream(
+                request, response.status_code, response.streaming_content,
+                stats
+            )
+        else:
+            stats.record(request, response.status_code, len(response.content))
+        return response
+
+    def process_template_response(self, request, response):
+        # Ответ DRF рендерится после представления, вне get_response.
+        stats = LOCAL.stats
+        started = time.perf_counter()
+
+        def rendered(response):
+            stats.serialization += time.perf_counter() - started
+        response.add_post_render_callback(rendered)
+        return response
+
+    def stream(self, request, status_code, content, stats):
+        # Запросы потоковой выгрузки идут, пока отдаётся тело ответа.
+        size = 0
+        LOCAL.stats = stats
+        try:
+            with stats.watch_queries():
+                for chunk in content:
+                    size += len(chunk)
+                    yield chunk
+        finally:
+            LOCAL.stats = None
+            stats.record(request, status_code, size)
+
+
+class MeasuredSerializerMixin:
+    """Учитывает время to_representation в текущем запросе.
+
+    Для списка время складывается по элементам; вложенные сериализаторы
+    не считаются повторно внутри внешнего.
+    """
+
+    def to_representation(self, instance):
+        stats = getattr(LOCAL, 'stats', None)
+        if stats is None or stats.serializing:
+            return super().to_representation(instance)
+        stats.serializing = True
+        started = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            stats.serializing = False
+            stats.serialization += time.perf_counter() - started
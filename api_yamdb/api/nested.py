@@ -0,0 +1,72 @@
+from django.db import IntegrityError, transaction
+from django.db.models import UniqueConstraint
+from django.shortcuts import get_object_or_404
+from django.utils.functional import cached_property
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+SQLITE_UNIQUE_FAILED = 'UNIQUE constraint failed: '
+
+
+def columns(model, fields):
+    return {model._meta.get_field(field).column for field in fields}
+
+
+def is_unique_violation(error, model, fields):
+    """Нарушила ли ошибка целостности уникальность полей fields модели.
+
+    PostgreSQL называет нарушенное ограничение, SQLite - его столбцы.
+    """
+    unique = columns(model, fields)
+    diag = getattr(error.__cause__, 'diag', None)
+    if diag is not None:
+        return any(
+            constraint.name == diag.constraint_name
+            and columns(model, constraint.fields) == unique
+            for constraint in model._meta.constraints
+            if isinstance(constraint, UniqueConstraint)
+        )
+    message = str(error)
+    if not message.startswith(SQLITE_UNIQUE_FAILED):
+        return False
+    return {
+        name.split('.')[-1]
+        for name in message[len(SQLITE_UNIQUE_FAILED):].split(', ')
+    } == unique
+
+
+class NestedParentMixin:
+    """Вьюсет вложенного ресурса: родитель из URL ищется раз на запрос.
+
+    parent_lookups сопоставляет поля родителя аргументам URL, например
+    {'pk': 'title_id'}. Найденный родитель хранится во вьюсете и общий
+    для get_queryset, проверок и сохранения.
+    """
+    parent_queryset = None
+    parent_lookups = {}
+
+    @cached_property
+    def parent(self):
+        return get_object_or_404(self.parent_queryset, **{
+            field: self.kwargs[kwarg]
+            for field, kwarg in self.parent_lookups.items()
+        })
+
+    def save_unique(self, serializer, message, **kwargs):
+        """Сохраняет объект, полагаясь на уникальный индекс БД.
+
+        Вместо проверки exists() перед вставкой нарушение уникального
+        ограничения по полям kwargs превращается в ошибку валидации,
+        остальные ошибки целостности не перехватываются. Точка
+        сохранения нужна, чтобы внешняя транзакция осталась рабочей.
+        """
+        try:
+            with transaction.atomic():
+                serializer.save(**kwargs)
+        except IntegrityError as error:
+            model = serializer.Meta.model
+            if not is_unique_violation(error, model, kwargs):
+                raise
+            raise serializers.ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [message]}
+            )
@@ -1,16 +1,195 @@
-from rest_framework.pagination import PageNumberPagination
+import hashlib
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 from rest_framework.response import Response
 
 from api_yamdb.settings import PAGINATOR_PAGE_ITEMS_COUNT
 
+COUNT_KEY = 'yamdb:count:{}'
+TABLE_ROWS_KEY = 'yamdb:table-rows:{}'
+
+
+def table_rows(queryset):
+    """Примерный размер всей таблицы модели, закэшированный ненадолго.
+
+    PostgreSQL берёт его из статистики pg_class; если таблицу ещё ни
+    разу не анализировали, как и на других СУБД, считается COUNT(*).
+    """
+    table = queryset.model._meta.db_table
+    key = TABLE_ROWS_KEY.format(table)
+    rows = cache.get(key)
+    if rows is not None:
+        return rows
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT reltuples FROM pg_class WHERE oid = %s::regclass',
+                [connection.ops.quote_name(table)]
+            )
+            rows = int(cursor.fetchone()[0])
+    if rows is None or rows < 0:
+        rows = queryset.model._default_manager.using(queryset.db).count()
+    cache.set(key, rows, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+    return rows
+
+
+def planner_estimate(queryset):
+    """Оценка числа строк от планировщика PostgreSQL или None."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    # Как и COUNT(*), оценке не нужны select_related и сортировка.
+    queryset = queryset.select_related(None).order_by()
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CountQuerysetPaginator(Paginator):
+    """Paginator, который считает count по отдельной выборке.
+
+    Строкам values() для страницы нужны соединения для полей ответа,
+    COUNT(*) они только замедляют; count_queryset - та же выборка без
+    них. Без count_queryset count считается по object_list.
+    """
+
+    def __init__(self, object_list, per_page, orphans=0,
+                 allow_empty_first_page=True, count_queryset=None):
+        super().__init__(object_list, per_page, orphans,
+                         allow_empty_first_page)
+        self.count_queryset = (
+            object_list if count_queryset is None else count_queryset
+        )
+
+    @cached_property
+    def count(self):
+        if self.count_queryset is self.object_list:
+            return super().count
+        return self.count_queryset.count()
+
+
+class EstimatedCountPaginator(CountQuerysetPaginator):
+    """Paginator, который не считает COUNT(*) по большим выборкам.
+
+    Пока таблица или выборка меньше PAGINATION_COUNT_THRESHOLD, count
+    точный. На PostgreSQL для больших выборок берётся оценка планировщика, на
+    остальных СУБД — точный count, закэшированный на
+    PAGINATION_COUNT_CACHE_TIMEOUT секунд. count_is_exact показывает,
+    какой из вариантов сработал.
+    """
+    count_is_exact = True
+
+    @cached_property
+    def count(self):
+        threshold = settings.PAGINATION_COUNT_THRESHOLD
+        queryset = self.count_queryset
+        if (not threshold or not isinstance(queryset, QuerySet)
+                or table_rows(queryset) < threshold):
+            return super().count
+        estimate = planner_estimate(queryset)
+        if estimate is None:
+            return self.cached_count(threshold)
+        if estimate < threshold:
+            return super().count
+        self.count_is_exact = False
+        return estimate
+
+    def cached_count(self, threshold):
+        key = COUNT_KEY.format(
+            hashlib.md5(str(self.count_queryset.query).encode()).hexdigest()
+        )
+        count = cache.get(key)
+        if count is not None:
+            self.count_is_exact = False
+            return count
+        count = self.count_queryset.count()
+        if count >= threshold:
+            cache.set(key, count, settings.PAGINATION_COUNT_CACHE_TIMEOUT)
+        return count
 
-class Pagination(PageNumberPagination):
+
+class CountQuerysetMixin:
+    """PageNumberPagination, которой можно передать выборку для count."""
+    django_paginator_class = CountQuerysetPaginator
+
+    def paginate_queryset(self, queryset, request, view=None,
+                          count_queryset=None):
+        # Paginator создаёт PageNumberPagination, выборка для count
+        # передаётся ему вместе с классом.
+        self.django_paginator_class = partial(
+            type(self).django_paginator_class, count_queryset=count_queryset
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+
+class Pagination(CountQuerysetMixin, PageNumberPagination):
     page_size = PAGINATOR_PAGE_ITEMS_COUNT
+    django_paginator_class = EstimatedCountPaginator
 
     def get_paginated_response(self, data):
         return Response({
             'next': self.get_next_link(),
             'previous': self.get_previous_link(),
             'count': self.page.paginator.count,
+            'count_exact': self.page.paginator.count_is_exact,
             'results': data
         })
+
+
+class PubDateCursorPagination(CursorPagination):
+    """Курсор по (pub_date, id): страница стоит одинаково на любой глубине."""
+    page_size = PAGINATOR_PAGE_ITEMS_COUNT
+    ordering = ('pub_date', 'id')
+
+
+class OptionalCursorPagination(CountQuerysetMixin, PageNumberPagination):
+    """Постраничная навигация по номеру страницы или, по запросу, курсором.
+
+    Курсор включается параметром ?pagination=cursor; ссылки next и previous
+    несут параметр cursor. Без них ответ прежний: count, next, previous.
+    """
+    page_size = PAGINATOR_PAGE_ITEMS_COUNT
+    mode_query_param = 'pagination'
+    cursor_pagination_class = PubDateCursorPagination
+    cursor_paginator = None
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == 'cursor'
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None,
+                          count_queryset=None):
+        if not self.use_cursor(request):
+            return super().paginate_queryset(
+                queryset, request, view, count_queryset
+            )
+        self.cursor_paginator = self.cursor_pagination_class()
+        self.display_page_controls = (
+            self.cursor_paginator.template is not None
+        )
+        return self.cursor_paginator.paginate_queryset(
+            queryset, request, view
+        )
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def to_html(self):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.to_html()
+        return super().to_html()
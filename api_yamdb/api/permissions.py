@@ -1,3 +1,6 @@
+import hmac
+
+from django.conf import settings
 from rest_framework import permissions
 
 
@@ -31,3 +34,13 @@ class UserPermission(permissions.BasePermission):
             or request.user.is_moderator
             or request.user.is_staff
         )
+
+
+class HasMetricsToken(permissions.BasePermission):
+    """Сборщик метрик с заголовком Authorization: Token <METRICS_TOKEN>."""
+
+    def has_permission(self, request, view):
+        token = settings.METRICS_TOKEN
+        return bool(token) and hmac.compare_digest(
+            request.META.get('HTTP_AUTHORIZATION', ''), f'Token {token}'
+        )
@@ -0,0 +1,69 @@
+"""Рендереры и парсеры JSON на orjson и MessagePack.
+
+FastJSONRenderer отдаёт те же байты, что JSONRenderer DRF: компактный
+UTF-8, даты, Decimal, ленивые строки и прочие типы кодируются тем же
+JSONEncoder DRF. MessagePack выбирается заголовком Accept или
+Content-Type application/msgpack, для внутренних сервисов.
+"""
+import msgpack
+import orjson
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser, JSONParser
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+# Даты проходят через JSONEncoder DRF: он пишет UTC как Z.
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+MSGPACK_TYPE = 'application/msgpack'
+
+encode_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson; с отступами - прежний рендерер DRF."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if self.ensure_ascii or not self.compact or self.get_indent(
+                accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+        ret = orjson.dumps(data, default=encode_default,
+                           option=ORJSON_OPTIONS)
+        if b'\xe2\x80' not in ret:
+            return ret
+        # Как DRF: U+2028 и U+2029 ломают JSON внутри <script>.
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+            b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackRenderer(BaseRenderer):
+    media_type = MSGPACK_TYPE
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=encode_default, use_bin_type=True)
+
+
+class MessagePackParser(BaseParser):
+    media_type = MSGPACK_TYPE
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False)
+        except (ValueError, TypeError, msgpack.UnpackException) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
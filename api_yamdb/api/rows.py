@@ -0,0 +1,212 @@
+"""Быстрая выдача списков: строки values() вместо объектов моделей.
+
+RowMapper один раз разбирает поля сериализатора и затем превращает
+строки values() в те же представления, что вернул бы сериализатор:
+без экземпляров моделей и без to_representation на каждое поле, если
+значение из БД уже годится для ответа. Связи многие-ко-многим
+загружаются одним запросом на страницу. Если поле разобрать нельзя,
+список отдаёт сериализатор, как раньше.
+"""
+from operator import itemgetter
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.response import Response
+
+# to_representation этих полей возвращает значение из БД как есть.
+PLAIN_FIELDS = (serializers.CharField, serializers.IntegerField,
+                serializers.PrimaryKeyRelatedField,
+                serializers.SlugRelatedField)
+CONVERTED_FIELDS = (serializers.BooleanField, serializers.DateField,
+                    serializers.DateTimeField, serializers.DecimalField,
+                    serializers.FloatField, serializers.UUIDField)
+
+MAPPERS = {}
+
+
+class UnsupportedFieldError(Exception):
+    """Поле сериализатора нельзя получить из строки values()."""
+
+
+def model_field(model, source):
+    try:
+        return model._meta.get_field(source)
+    except FieldDoesNotExist:
+        raise UnsupportedFieldError(source) from None
+
+
+def field_column(model, field, prefix=''):
+    """Столбец values() для поля field сериализатора модели model."""
+    if not isinstance(field, PLAIN_FIELDS + CONVERTED_FIELDS):
+        raise UnsupportedFieldError(field.field_name)
+    db_field = model_field(model, field.source)
+    if not db_field.concrete or db_field.many_to_many:
+        raise UnsupportedFieldError(field.field_name)
+    if isinstance(field, serializers.SlugRelatedField):
+        return f'{prefix}{field.source}__{field.slug_field}'
+    if isinstance(field, serializers.RelatedField):
+        if not db_field.is_relation or field.pk_field is not None:
+            raise UnsupportedFieldError(field.field_name)
+    elif db_field.is_relation:
+        raise UnsupportedFieldError(field.field_name)
+    return f'{prefix}{field.source}'
+
+
+def column_getter(column, field):
+    if isinstance(field, PLAIN_FIELDS):
+        return itemgetter(column)
+    get = itemgetter(column)
+    convert = field.to_representation
+
+    def getter(row):
+        value = get(row)
+        return None if value is None else convert(value)
+    return getter
+
+
+def plain_getters(model, serializer, prefix=''):
+    """Пары (имя поля, функция строки) и нужные им столбцы."""
+    getters = []
+    columns = []
+    for field in serializer._readable_fields:
+        column = field_column(model, field, prefix)
+        columns.append(column)
+        getters.append((field.field_name, column_getter(column, field)))
+    return getters, columns
+
+
+def nested_getter(column, getters):
+    get = itemgetter(column)
+
+    def getter(row):
+        if get(row) is None:
+            return None
+        return {name: get_value(row) for name, get_value in getters}
+    return getter
+
+
+def empty(row):
+    return None
+
+
+class ManyRelation:
+    """Вложенный список по связи многие-ко-многим: запрос на страницу."""
+
+    def __init__(self, db_field, child):
+        self.model = db_field.related_model
+        self.lookup = db_field.related_query_name()
+        self.getters, self.columns = plain_getters(self.model, child)
+
+    def load(self, pks):
+        """Представления связанных объектов по id родителей."""
+        related = {}
+        # Порядок тот же, что у prefetch_related: по ordering модели.
+        rows = self.model._default_manager.filter(**{
+            f'{self.lookup}__in': pks
+        }).values(self.lookup, *self.columns)
+        for row in rows:
+            related.setdefault(row[self.lookup], []).append({
+                name: get_value(row) for name, get_value in self.getters
+            })
+        return related
+
+
+class RowMapper:
+    """Представления сериализатора из строк values() его модели.
+
+    Поддерживаются простые поля модели, PrimaryKeyRelatedField,
+    SlugRelatedField, вложенный сериализатор по внешнему ключу и
+    вложенный список по связи многие-ко-многим с простыми полями.
+    """
+
+    def __init__(self, serializer):
+        model = serializer.Meta.model
+        self.pk = model._meta.pk.name
+        self.columns = [self.pk]
+        self.getters = []
+        self.relations = []
+        for field in serializer._readable_fields:
+            name = field.field_name
+            if isinstance(field, serializers.ListSerializer):
+                db_field = model_field(model, field.source)
+                if not db_field.many_to_many or db_field.auto_created:
+                    raise UnsupportedFieldError(name)
+                self.relations.append(
+                    (name, ManyRelation(db_field, field.child))
+                )
+                self.getters.append((name, empty))
+            elif isinstance(field, serializers.BaseSerializer):
+                db_field = model_field(model, field.source)
+                if not db_field.concrete or not db_field.is_relation:
+                    raise UnsupportedFieldError(name)
+                getters, columns = plain_getters(
+                    db_field.related_model, field, f'{field.source}__'
+                )
+                self.columns += [field.source] + columns
+                self.getters.append(
+                    (name, nested_getter(field.source, getters))
+                )
+            else:
+                column = field_column(model, field)
+                self.columns.append(column)
+                self.getters.append((name, column_getter(column, field)))
+
+    def values(self, queryset, extra_columns=()):
+        return queryset.prefetch_related(None).values(
+            *dict.fromkeys(self.columns + list(extra_columns))
+        )
+
+    def map(self, rows):
+        rows = list(rows)
+        items = [
+            {name: get_value(row) for name, get_value in self.getters}
+            for row in rows
+        ]
+        if not rows:
+            return items
+        for name, relation in self.relations:
+            related = relation.load([row[self.pk] for row in rows])
+            for row, item in zip(rows, items):
+                item[name] = related.get(row[self.pk], [])
+        return items
+
+
+def row_mapper(serializer):
+    """RowMapper для набора полей сериализатора или None."""
+    key = (type(serializer), tuple(serializer.fields))
+    if key not in MAPPERS:
+        try:
+            MAPPERS[key] = RowMapper(serializer)
+        except UnsupportedFieldError:
+            MAPPERS[key] = None
+    return MAPPERS[key]
+
+
+class RowListMixin:
+    """list() из строк values() через RowMapper.
+
+    row_columns - столбцы, нужные помимо полей ответа, например для
+    позиции курсора пагинации. Пагинация должна принимать
+    count_queryset, см. api.pagination.CountQuerysetMixin.
+    """
+    row_columns = ()
+
+    def list(self, request, *args, **kwargs):
+        mapper = row_mapper(self.get_serializer())
+        if mapper is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = mapper.values(queryset, self.row_columns)
+        page = self.paginate_rows(rows, queryset)
+        if page is not None:
+            return self.get_paginated_response(mapper.map(page))
+        return Response(mapper.map(rows))
+
+    def paginate_rows(self, rows, queryset):
+        """Страница строк; count считается по queryset без соединений
+        values() для полей ответа."""
+        if self.paginator is None:
+            return None
+        return self.paginator.paginate_queryset(
+            rows, self.request, view=self, count_queryset=queryset
+        )
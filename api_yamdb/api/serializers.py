@@ -1,12 +1,21 @@
 from django.core.exceptions import ValidationError
-from django.db.models import Avg, CharField, EmailField
-from django.shortcuts import get_object_or_404
+from django.db.models import CharField, EmailField
 from rest_framework import serializers
 from rest_framework.validators import UniqueForYearValidator, UniqueValidator
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.models import (Category, Comment, Genre, Leaderboard, Review,
+                            Title, User)
 
+from .metrics import MeasuredSerializerMixin
+from .sparse import SparseFieldsMixin
 
-class CreateUserSerializer(serializers.ModelSerializer):
+ONE_REVIEW_MESSAGE = 'Можно оставлять только одно ревью к тайтлу'
+
+
+class ModelSerializer(MeasuredSerializerMixin, serializers.ModelSerializer):
+    """ModelSerializer, время которого попадает в метрики запроса."""
+
+
+class CreateUserSerializer(ModelSerializer):
     email = EmailField(
         validators=[UniqueValidator(queryset=User.objects.all())]
     )
@@ -37,7 +46,7 @@ class CreateUserSerializer(serializers.ModelSerializer):
         model = User
 
 
-class CreateUserInBaseSerializer(serializers.ModelSerializer):
+class CreateUserInBaseSerializer(ModelSerializer):
 
     email = EmailField(
         validators=[UniqueValidator(queryset=User.objects.all())]
@@ -52,49 +61,52 @@ class CreateUserInBaseSerializer(serializers.ModelSerializer):
         read_only_fields = ('confirmation_code',)
 
 
-class CreateTokenSerializer(serializers.ModelSerializer):
+class CreateTokenSerializer(ModelSerializer):
     class Meta:
         fields = ('username', 'confirmation_code')
         model = User
         read_only_fields = ('username', )
 
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(ModelSerializer):
     class Meta:
         model = Category
         fields = ('name', 'slug')
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(ModelSerializer):
     class Meta:
         model = Genre
         fields = ('name', 'slug')
         lookup_field = 'slug'
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(SparseFieldsMixin, ModelSerializer):
     category = CategorySerializer(read_only=True)
     genre = GenreSerializer(many=True, read_only=True)
-    rating = serializers.SerializerMethodField()
+    rating = serializers.FloatField(read_only=True)
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = (
+            'id', 'category', 'genre', 'rating', 'name', 'year', 'description'
+        )
         read_only_fields = ('id',)
         validators = UniqueForYearValidator(queryset=Title.objects.all(),
                                             field='pk',
                                             date_field='published',
                                             message='Неверно указан год')
 
-    def get_rating(self, obj):
-        try:
-            rating = obj.reviews.aggregate(Avg('score'))
-            return rating.get('score__avg')
-        except TypeError:
-            return None
 
+class LeaderboardSerializer(ModelSerializer):
+    title = TitleSerializer(read_only=True)
 
-class TitleCreateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Leaderboard
+        fields = ('score', 'title')
+
+
+class TitleCreateSerializer(ModelSerializer):
     category = serializers.SlugRelatedField(
         slug_field='slug',
         queryset=Category.objects.all()
@@ -106,11 +118,34 @@ class TitleCreateSerializer(serializers.ModelSerializer):
     )
 
     class Meta:
-        fields = '__all__'
+        fields = (
+            'id', 'category', 'genre', 'name', 'year', 'description', 'rating'
+        )
         model = Title
+        read_only_fields = ('rating',)
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class TitleBatchSerializer(TitleCreateSerializer):
+    """Произведение из пакета: слаги сверяются с заранее загруженными."""
+    category = serializers.SlugField()
+    genre = serializers.ListField(child=serializers.SlugField())
+
+    def resolve(self, kind, slug):
+        try:
+            return self.context[kind][slug]
+        except KeyError:
+            raise ValidationError(
+                f'Объект с slug={slug} не существует.'
+            ) from None
+
+    def validate_category(self, value):
+        return self.resolve('categories', value)
+
+    def validate_genre(self, value):
+        return [self.resolve('genres', slug) for slug in value]
+
+
+class ReviewSerializer(SparseFieldsMixin, ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username',
@@ -122,20 +157,8 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         read_only_fields = ('id', 'title', 'author', 'pub_date')
 
-    def validate(self, data):
-        title_id = self.context['view'].kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        request = self.context['request']
-        if request.method == 'POST':
-            if Review.objects.filter(author=request.user,
-                                     title=title).exists():
-                raise ValidationError(
-                    'Можно оставлять только одно ревью к тайтлу'
-                )
-        return data
 
-
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(SparseFieldsMixin, ModelSerializer):
     author = serializers.SlugRelatedField(
         read_only=True,
         slug_field='username',
@@ -146,3 +169,28 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = '__all__'
         model = Comment
         read_only_fields = ('id', 'author', 'pub_date', 'reviews', 'title')
+
+
+class ReviewBatchSerializer(ReviewSerializer):
+    """Отзыв из пакета: произведение указывается в самом отзыве.
+
+    Существующие произведения и уже оставленные автором отзывы
+    загружаются на весь пакет заранее, см. ReviewViewSet.batch.
+    """
+    title = serializers.IntegerField()
+
+    class Meta(ReviewSerializer.Meta):
+        read_only_fields = ('id', 'author', 'pub_date')
+
+    def validate_title(self, value):
+        if value not in self.context['titles']:
+            raise ValidationError('Произведение не найдено')
+        return value
+
+    def validate(self, data):
+        reviewed = self.context['reviewed']
+        if data['title'] in reviewed:
+            raise ValidationError(ONE_REVIEW_MESSAGE)
+        # Второй отзыв на то же произведение в пакете тоже отклоняется.
+        reviewed.add(data['title'])
+        return data
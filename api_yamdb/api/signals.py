@@ -0,0 +1,111 @@
+from django.db import transaction
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from reviews.leaderboards import forget_scope, schedule_refresh
+from reviews.models import (Category, Comment, Genre, Leaderboard, Review,
+                            Title, User)
+
+from .authentication import invalidate_user
+from .cache import bump_version
+
+# Какие закэшированные ресурсы устаревают при записи в модель.
+DEPENDENT_RESOURCES = {
+    Title: ('titles',),
+    Genre: ('genres', 'titles'),
+    Category: ('categories', 'titles'),
+    Review: ('titles',),
+}
+
+
+def bump_on_commit(*resources):
+    transaction.on_commit(lambda: bump_version(*resources))
+
+
+def invalidate_resources(sender, **kwargs):
+    bump_on_commit(*DEPENDENT_RESOURCES[sender])
+
+
+# Приёмник только у этих моделей: у остальных, например Leaderboard,
+# QuerySet.delete() остаётся одним DELETE без выборки строк.
+for model in DEPENDENT_RESOURCES:
+    post_save.connect(invalidate_resources, sender=model)
+    post_delete.connect(invalidate_resources, sender=model)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def invalidate_reviews(sender, instance, **kwargs):
+    bump_on_commit(f'reviews:{instance.title_id}')
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comments(sender, instance, **kwargs):
+    bump_on_commit(f'comments:{instance.reviews_id}')
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_auth_user(sender, instance, **kwargs):
+    # Роль, is_staff или is_active могли измениться: сбрасываем кэш
+    # после коммита, чтобы параллельный запрос не закэшировал старое.
+    user_id = instance.pk
+    transaction.on_commit(lambda: invalidate_user(user_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Genre)
+def touch_titles_on_rename(sender, instance, created, **kwargs):
+    if not created:
+        instance.titles.touch()
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Genre)
+def touch_titles_on_delete(sender, instance, **kwargs):
+    instance.titles.touch()
+
+
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Genre)
+def forget_leaderboard(sender, instance, **kwargs):
+    forget_scope(
+        Leaderboard.CATEGORY if sender is Category else Leaderboard.GENRE,
+        instance.pk
+    )
+
+
+@receiver(post_save, sender=Title)
+def refresh_title_leaderboards(sender, instance, created, **kwargs):
+    # Могла смениться категория; без отзывов произведения нет в рейтингах.
+    if not created and instance.reviews_count:
+        schedule_refresh([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def invalidate_title_genres(sender, instance, action, reverse, pk_set,
+                            **kwargs):
+    if action == 'pre_clear' and reverse:
+        instance.titles.touch()
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        Title.objects.filter(pk=instance.pk).touch()
+    elif pk_set:
+        Title.objects.filter(pk__in=pk_set).touch()
+    bump_on_commit('titles')
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def refresh_genre_leaderboards(sender, instance, action, reverse, pk_set,
+                               **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        if instance.reviews_count:
+            schedule_refresh([instance.pk])
+    elif action == 'post_clear':
+        forget_scope(Leaderboard.GENRE, instance.pk)
+    else:
+        schedule_refresh(pk_set)
@@ -0,0 +1,176 @@
+"""Журнал медленных SQL-запросов.
+
+Включается SLOW_QUERY_MS: запрос дольше порога пишется строкой JSON в
+SLOW_QUERY_LOG вместе с представлением, нормализованным SQL и
+параметрами. На PostgreSQL к записи добавляется план EXPLAIN, но не
+для каждого запроса: доля SLOW_QUERY_EXPLAIN_SAMPLE, не чаще раза в
+минуту на один отпечаток и не больше SLOW_QUERY_EXPLAINS_PER_MINUTE
+планов в минуту на процесс. Сводку строит manage.py slow_queries.
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.utils import timezone
+
+from .metrics import LOCAL, view_name
+
+logger = logging.getLogger(__name__)
+
+MAX_SQL = 10000
+MAX_PARAM = 200
+MAX_PARAMS = 50
+EXPLAIN_PERIOD = 60
+EXPLAINABLE = ('select', 'with', 'insert', 'update', 'delete')
+
+STRINGS = re.compile(r"'(?:[^']|'')*'")
+NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDERS = re.compile(r'%s|%\(\w+\)s|\?')
+LISTS = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+SPACES = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """SQL без значений: одинаковые запросы с разными параметрами,
+    LIMIT и длиной списка IN дают одну строку."""
+    sql = STRINGS.sub('?', sql)
+    sql = NUMBERS.sub('?', sql)
+    sql = PLACEHOLDERS.sub('?', sql)
+    sql = LISTS.sub('IN (...)', sql)
+    return SPACES.sub(' ', sql).strip()
+
+
+def fingerprint(normalized):
+    return hashlib.md5(normalized.encode()).hexdigest()[:12]
+
+
+def short_params(params, many):
+    if params is None:
+        return None
+    if many:
+        return f'{len(params)} наборов параметров'
+    if isinstance(params, dict):
+        params = list(params.values())
+    return [
+        value if isinstance(value, (int, float, bool, type(None)))
+        else str(value)[:MAX_PARAM]
+        for value in list(params)[:MAX_PARAMS]
+    ]
+
+
+class ExplainLimiter:
+    """Решает, снимать ли план: выборка, отпечаток и лимит в минуту."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.recent = deque()
+        self.explained = {}
+
+    def allow(self, key):
+        if random.random() >= settings.SLOW_QUERY_EXPLAIN_SAMPLE:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            while self.recent and now - self.recent[0] > EXPLAIN_PERIOD:
+                self.recent.popleft()
+            if (len(self.recent) >= settings.SLOW_QUERY_EXPLAINS_PER_MINUTE
+                    or now - self.explained.get(key, -EXPLAIN_PERIOD)
+                    < EXPLAIN_PERIOD):
+                return False
+            self.recent.append(now)
+            self.explained[key] = now
+        return True
+
+
+LIMITER = ExplainLimiter()
+
+
+def explain(connection, sql, params):
+    """План PostgreSQL без выполнения запроса.
+
+    Курсор берётся у psycopg2 напрямую: у курсора Django ещё не прочитан
+    результат, а обёртки execute не должны видеть EXPLAIN. Внутри
+    транзакции ошибка EXPLAIN откатывается до точки сохранения, чтобы
+    не сломать транзакцию запроса.
+    """
+    savepoint = connection.in_atomic_block
+    with connection.connection.cursor() as cursor:
+        if savepoint:
+            cursor.execute('SAVEPOINT slow_query_explain')
+        try:
+            cursor.execute(f'EXPLAIN (ANALYZE off) {sql}', params)
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+        except Exception as error:
+            if savepoint:
+                cursor.execute('ROLLBACK TO SAVEPOINT slow_query_explain')
+            return f'EXPLAIN не удался: {error}'
+        if savepoint:
+            cursor.execute('RELEASE SAVEPOINT slow_query_explain')
+    return plan
+
+
+def write(entry):
+    # Одна запись O_APPEND: строки разных процессов не перемешиваются.
+    line = json.dumps(entry, ensure_ascii=False, default=str) + '\n'
+    descriptor = os.open(settings.SLOW_QUERY_LOG,
+                         os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(descriptor, line.encode())
+    finally:
+        os.close(descriptor)
+
+
+def log_slow_query(execute, sql, params, many, context):
+    """execute_wrapper: пишет запросы дольше SLOW_QUERY_MS, в том числе
+    прерванные ошибкой, например statement_timeout."""
+    started = time.perf_counter()
+    error = None
+    try:
+        return execute(sql, params, many, context)
+    except Exception as exc:
+        error = exc
+        raise
+    finally:
+        duration = (time.perf_counter() - started) * 1000
+        if duration >= settings.SLOW_QUERY_MS:
+            record(context['connection'], sql, params, many, duration,
+                   error)
+
+
+def record(connection, sql, params, many, duration, error):
+    normalized = normalize(sql)
+    key = fingerprint(normalized)
+    stats = getattr(LOCAL, 'stats', None)
+    entry = {
+        'time': timezone.now().isoformat(),
+        'duration_ms': round(duration, 3),
+        'database': connection.alias,
+        'view': view_name(stats.request) if stats else None,
+        'fingerprint': key,
+        'normalized': normalized[:MAX_SQL],
+        'sql': sql[:MAX_SQL],
+        'params': short_params(params, many),
+        'error': str(error) if error else None,
+        'plan': None,
+    }
+    if (connection.vendor == 'postgresql' and not many and error is None
+            and sql.lstrip().lower().startswith(EXPLAINABLE)
+            and LIMITER.allow(key)):
+        entry['plan'] = explain(connection, sql, params)
+    try:
+        write(entry)
+    except OSError:
+        logger.exception('Не удалось записать медленный запрос')
+
+
+def install(connection, **kwargs):
+    """Обработчик connection_created: вешает журнал на соединение."""
+    if log_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(log_slow_query)
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+FIELDS_PARAM = 'fields'
+OMIT_PARAM = 'omit'
+
+
+def split_names(value):
+    return {name.strip() for name in value.split(',') if name.strip()}
+
+
+def sparse_fields(request, names):
+    """Поля ответа по ?fields= и ?omit= GET-запроса.
+
+    fields оставляет перечисленные через запятую поля из names, omit
+    убирает перечисленные. Без параметров - None: нужны все поля.
+    Неизвестное имя поля - ошибка валидации.
+    """
+    if request is None or request.method != 'GET':
+        return None
+    fields = request.query_params.get(FIELDS_PARAM, '')
+    omit = request.query_params.get(OMIT_PARAM, '')
+    if not fields and not omit:
+        return None
+    names = set(names)
+    errors = {
+        param: [f'Неизвестные поля: {", ".join(sorted(unknown))}']
+        for param, unknown in (
+            (FIELDS_PARAM, split_names(fields) - names),
+            (OMIT_PARAM, split_names(omit) - names),
+        )
+        if unknown
+    }
+    if errors:
+        raise serializers.ValidationError(errors)
+    return (split_names(fields) or names) - split_names(omit)
+
+
+class SparseFieldsMixin:
+    """Сериализатор ответа с полями по ?fields= и ?omit=.
+
+    Действует только на внешний сериализатор ответа: вложенные в
+    другие сериализаторы отдают все поля.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        parent = self.parent
+        if isinstance(parent, serializers.ListSerializer):
+            parent = parent.parent
+        if parent is not None:
+            return fields
+        kept = sparse_fields(self.context.get('request'), fields)
+        if kept is None:
+            return fields
+        return OrderedDict(
+            (name, field) for name, field in fields.items() if name in kept
+        )
+
+
+class SparseQuerysetMixin:
+    """Вьюсет, который загружает из БД только поля ответа.
+
+    Связи из select_fields и prefetch_fields подтягиваются, только если
+    их поле есть в ответе, а столбцы без поля в ответе откладываются.
+    """
+    select_fields = ()
+    prefetch_fields = ()
+
+    def get_response_fields(self):
+        """Поля ответа list и retrieve или None, если нужны все."""
+        if self.action not in ('list', 'retrieve'):
+            return None
+        return sparse_fields(
+            self.request, self.get_serializer_class()().fields
+        )
+
+    def sparse_queryset(self, queryset):
+        fields = self.get_response_fields()
+        for name in self.select_fields:
+            if fields is None or name in fields:
+                queryset = queryset.select_related(name)
+        for name in self.prefetch_fields:
+            if fields is None or name in fields:
+                queryset = queryset.prefetch_related(name)
+        if fields is None:
+            return queryset
+        columns = [queryset.model._meta.pk.name]
+        for name in fields:
+            try:
+                field = queryset.model._meta.get_field(name)
+            except FieldDoesNotExist:
+                continue
+            if field.concrete and not field.many_to_many:
+                columns.append(name)
+        return queryset.only(*columns)
@@ -0,0 +1,19 @@
+from django.core.mail import send_mail
+from jobs.queue import handler
+
+from api_yamdb.settings import EMAIL_FROM
+
+
+def send_mail_with_code(confirmation_code, email):
+    send_mail(
+        'Код регистрации',
+        confirmation_code,
+        EMAIL_FROM,
+        [email],
+        fail_silently=False,
+    )
+
+
+@handler('send_confirmation_code')
+def send_confirmation_code(payload):
+    send_mail_with_code(payload['confirmation_code'], payload['email'])
@@ -0,0 +1,48 @@
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import Genre, User
+
+
+class CachedJWTAuthenticationTests(TransactionTestCase):
+    """Пользователь JWT берётся из кэша и сбрасывается при изменении."""
+
+    def setUp(self):
+        cache.clear()
+        Genre.objects.create(name='Драма', slug='drama')
+        self.user = User.objects.create(
+            username='critic', email='c@ya.ru', bio='Пишу отзывы'
+        )
+        self.client = APIClient()
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}'
+        )
+
+    def test_user_lookup_is_cached(self):
+        with self.assertNumQueries(3):
+            self.client.get('/api/v1/genres/')
+        with self.assertNumQueries(2):
+            self.client.get('/api/v1/genres/')
+
+    def test_role_change_applies_immediately(self):
+        self.assertEqual(self.client.get('/api/v1/users/').status_code, 403)
+        self.user.role = User.ADMIN
+        self.user.save()
+        self.assertEqual(self.client.get('/api/v1/users/').status_code, 200)
+
+    def test_inactive_user_is_rejected(self):
+        self.client.get('/api/v1/genres/')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/v1/genres/').status_code, 401)
+
+    def test_profile_is_loaded_in_full(self):
+        self.client.get('/api/v1/genres/')
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/users/me/')
+        self.assertEqual(response.json()['bio'], 'Пишу отзывы')
+        response = self.client.patch('/api/v1/users/me/', {'bio': 'Новое'})
+        self.assertEqual(response.json()['email'], 'c@ya.ru')
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.bio, 'Новое')
@@ -0,0 +1,140 @@
+from unittest import mock
+
+from api.batch import CONFLICT_MESSAGE, BatchCreateMixin
+from api.serializers import GenreSerializer
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import viewsets
+from rest_framework.test import APIClient, APIRequestFactory
+from reviews.models import Category, Genre, Review, Title, User
+from reviews.views import ReviewViewSet
+
+
+class GenreBatchViewSet(BatchCreateMixin, viewsets.GenericViewSet):
+    permission_classes = ()
+    batch_serializer_class = GenreSerializer
+
+
+class BatchCreateTests(TestCase):
+    """Пакетное создание произведений и отзывов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(
+            username='admin', email='a@ya.ru', role=User.ADMIN
+        )
+        cls.critic = User.objects.create(username='critic', email='c@ya.ru')
+        Category.objects.create(name='Фильм', slug='movie')
+        Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        cls.titles = [
+            Title.objects.create(name=f'Произведение {i}', year=2000)
+            for i in range(3)
+        ]
+        Review.objects.create(
+            title=cls.titles[0], author=cls.critic, text='Было', score=2
+        )
+        Title.objects.filter(pk=cls.titles[0].pk).update_rating(2, 1)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_titles_batch(self):
+        self.client.force_authenticate(self.admin)
+        items = [
+            {'name': f'Новое {i}', 'year': 2020, 'category': 'movie',
+             'genre': ['drama', 'comedy']}
+            for i in range(20)
+        ]
+        items.append({'name': 'Плохое', 'year': 2020, 'category': 'book',
+                      'genre': ['drama']})
+        response = self.client.post('/api/v1/titles/batch/', items,
+                                    format='json')
+        self.assertEqual(response.status_code, 207)
+        results = response.json()['results']
+        self.assertEqual(results[0]['status'], 201)
+        self.assertEqual(results[0]['data']['genre'], ['comedy', 'drama'])
+        self.assertEqual(results[-1]['status'], 400)
+        self.assertIn('category', results[-1]['errors'])
+        self.assertEqual(
+            Title.objects.filter(name__startswith='Новое',
+                                 genre__slug='comedy').count(), 20
+        )
+
+    def test_titles_batch_admin_only(self):
+        self.client.force_authenticate(self.critic)
+        response = self.client.post('/api/v1/titles/batch/', [{}],
+                                    format='json')
+        self.assertEqual(response.status_code, 403)
+
+    def test_reviews_batch_validates_set_based(self):
+        self.client.force_authenticate(self.critic)
+        items = [
+            {'title': self.titles[0].pk, 'text': 'Повтор', 'score': 5},
+            {'title': self.titles[1].pk, 'text': 'Хорошо', 'score': 8},
+            {'title': self.titles[2].pk, 'text': 'Плохо', 'score': 4},
+            {'title': self.titles[2].pk, 'text': 'Дубль', 'score': 4},
+            {'title': 0, 'text': 'Нет', 'score': 5},
+            {'title': self.titles[1].pk, 'text': 'Оценка', 'score': 11},
+        ]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post('/api/v1/reviews/batch/', items,
+                                        format='json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(
+            [result['status'] for result in response.json()['results']],
+            [400, 201, 201, 400, 400, 400]
+        )
+        self.assertEqual(
+            response.json()['results'][1]['data']['author'], 'critic'
+        )
+        # Проверка пакета не зависит от числа отзывов в нём.
+        self.assertEqual(sum(
+            query['sql'].startswith('SELECT') for query in queries
+        ), 2)
+        ratings = dict(Title.objects.values_list('pk', 'rating'))
+        self.assertEqual(
+            [ratings[title.pk] for title in self.titles], [2.0, 8.0, 4.0]
+        )
+
+    def test_reviews_batch_all_invalid(self):
+        self.client.force_authenticate(self.critic)
+        response = self.client.post(
+            '/api/v1/reviews/batch/', [{'title': 'x'}], format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            '/api/v1/reviews/batch/', {'title': 1}, format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_reviews_batch_conflict(self):
+        # Параллельный пакет успел сохранить отзыв после проверки.
+        self.client.force_authenticate(self.critic)
+        stale = {'titles': {self.titles[0].pk}, 'reviewed': set()}
+        with mock.patch.object(ReviewViewSet, 'get_batch_context',
+                               return_value=stale):
+            response = self.client.post('/api/v1/reviews/batch/', [
+                {'title': self.titles[0].pk, 'text': 'Гонка', 'score': 5},
+            ], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            response.json(), {'non_field_errors': [CONFLICT_MESSAGE]}
+        )
+        self.assertEqual(self.titles[0].reviews.count(), 1)
+
+    def test_default_batch_create(self):
+        view = GenreBatchViewSet.as_view({'post': 'batch'})
+        request = APIRequestFactory().post('/', [
+            {'name': 'Ужасы', 'slug': 'horror'},
+            {'name': 'Без слага'},
+        ], format='json')
+        response = view(request)
+        self.assertEqual(response.status_code, 207)
+        results = response.data['results']
+        self.assertEqual(results[0], {
+            'status': 201, 'data': {'name': 'Ужасы', 'slug': 'horror'}
+        })
+        self.assertEqual(results[1]['status'], 400)
+        self.assertTrue(Genre.objects.filter(slug='horror').exists())
@@ -0,0 +1,36 @@
+import random
+
+from api import benchmark
+from django.conf import settings
+from django.test import TestCase, override_settings
+
+
+@override_settings(REST_FRAMEWORK=dict(
+    settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES={}
+))
+class BenchmarkTests(TestCase):
+    """Маршруты замера работают на созданных данных, регрессии находятся."""
+
+    def test_all_routes_succeed(self):
+        data = benchmark.seed(random.Random(0), 20, 15, 15)
+        clients = benchmark.make_clients(data)
+        routes = benchmark.get_routes(data, 15, 15)
+        self.assertIn('reviews page=2', [route.name for route in routes])
+        for route in routes:
+            result = benchmark.measure(route, clients[route.user], data, 2, 0)
+            self.assertGreater(result['queries'], 0, route.name)
+
+    def test_regressions(self):
+        baseline = {
+            'title': {'p50': 5.0, 'queries': 3},
+            'genres': {'p50': 0.2, 'queries': 2},
+        }
+        results = {
+            'title': {'p50': 7.0, 'queries': 4},
+            'genres': {'p50': 0.6, 'queries': 2},
+            'new': {'p50': 1.0, 'queries': 1},
+        }
+        self.assertEqual(benchmark.regressions(results, baseline, 0.25), [
+            'title: запросов 3 -> 4',
+            'title: p50 5.00 -> 7.00 мс',
+        ])
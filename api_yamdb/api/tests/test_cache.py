@@ -0,0 +1,94 @@
+import io
+import tempfile
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Review, Title, User
+
+
+class ResponseCacheTests(TransactionTestCase):
+    """Анонимные списки отдаются из кэша и сбрасываются при записи."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = Category.objects.create(name='Фильм', slug='movie')
+        self.genre = Genre.objects.create(name='Драма', slug='drama')
+        self.title = Title.objects.create(
+            name='Титаник', year=1997, category=self.category
+        )
+        self.title.genre.add(self.genre)
+
+    def assert_cached(self, url, num_queries=0):
+        first = self.client.get(url)
+        with self.assertNumQueries(num_queries):
+            second = self.client.get(url)
+        self.assertEqual(first.json(), second.json())
+        return second.json()
+
+    def test_lists_and_detail_are_cached(self):
+        self.assert_cached('/api/v1/titles/?year=1997&genre=drama')
+        # Остаётся только запрос даты изменения для ETag.
+        self.assert_cached(f'/api/v1/titles/{self.title.pk}/', 1)
+        self.assert_cached('/api/v1/categories/?search=Фил')
+        self.assert_cached('/api/v1/genres/')
+
+    def test_query_string_is_normalized(self):
+        self.client.get('/api/v1/titles/?year=1997&name=Тит&genre=')
+        with self.assertNumQueries(0):
+            self.client.get('/api/v1/titles/?name=Тит&year=1997')
+
+    def test_unknown_params_bypass_cache(self):
+        self.client.get('/api/v1/titles/?utm=1')
+        with self.assertNumQueries(3):
+            self.client.get('/api/v1/titles/?utm=1')
+
+    def test_writes_invalidate_titles(self):
+        url = '/api/v1/titles/'
+        self.assert_cached(url)
+        Title.objects.create(name='Аватар', year=2009)
+        self.assertEqual(self.assert_cached(url)['count'], 2)
+
+        self.genre.name = 'Мелодрама'
+        self.genre.save()
+        data = self.assert_cached(url)
+        self.assertEqual(data['results'][1]['genre'][0]['name'], 'Мелодрама')
+
+        user = User.objects.create(username='critic', email='c@yamdb.ru')
+        Review.objects.create(
+            title=self.title, author=user, text='Отзыв', score=9
+        )
+        Title.objects.filter(pk=self.title.pk).update_rating(9, 1)
+        data = self.assert_cached(url)
+        self.assertEqual(data['results'][1]['rating'], 9.0)
+
+        self.title.genre.clear()
+        data = self.assert_cached(url)
+        self.assertEqual(data['results'][1]['genre'], [])
+
+    def test_rebuild_ratings_invalidates_titles(self):
+        url = '/api/v1/titles/'
+        # Рейтинг, разошедшийся с отзывами, в обход сигналов.
+        Title.objects.filter(pk=self.title.pk).update(
+            rating=7.0, score_sum=7, reviews_count=1
+        )
+        self.assertEqual(self.assert_cached(url)['results'][0]['rating'], 7)
+        call_command('rebuild_ratings', stdout=io.StringIO())
+        self.assertIsNone(self.assert_cached(url)['results'][0]['rating'])
+
+    def test_authenticated_requests_bypass_cache(self):
+        user = User.objects.create(username='critic', email='c@yamdb.ru')
+        self.client.force_authenticate(user)
+        self.client.get('/api/v1/genres/')
+        with self.assertNumQueries(2):
+            self.client.get('/api/v1/genres/')
+
+
+@override_settings(CACHES={'default': {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': tempfile.mkdtemp(),
+}})
+class FileBasedResponseCacheTests(ResponseCacheTests):
+    """Те же проверки на файловом бэкенде кэша."""
@@ -0,0 +1,108 @@
+from django.core.cache import cache
+from django.test import TransactionTestCase
+from rest_framework.test import APIClient
+from reviews.models import Comment, Genre, Review, Title, User
+
+
+class ConditionalGetTests(TransactionTestCase):
+    """ETag и Last-Modified: 304 без сериализации, новые валидаторы
+    после записи."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create(username='critic', email='c@ya.ru')
+        self.title = Title.objects.create(name='Титаник', year=1997)
+        self.review = Review.objects.create(
+            title=self.title, author=self.user, text='Отзыв', score=8
+        )
+        self.titles_url = '/api/v1/titles/'
+        self.title_url = f'/api/v1/titles/{self.title.pk}/'
+        self.reviews_url = f'{self.title_url}reviews/'
+        self.comments_url = f'{self.reviews_url}{self.review.pk}/comments/'
+
+    def assert_not_modified(self, url, num_queries=0):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        with self.assertNumQueries(num_queries):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+        return etag
+
+    def assert_modified(self, url, etag):
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_not_modified(self):
+        self.assert_not_modified(self.titles_url)
+        self.assert_not_modified(self.title_url, num_queries=1)
+        self.assert_not_modified(self.reviews_url)
+        self.assert_not_modified(f'{self.reviews_url}{self.review.pk}/')
+        self.assert_not_modified(self.comments_url)
+
+    def test_etag_depends_on_query(self):
+        etag = self.assert_not_modified(self.titles_url)
+        self.assert_modified(f'{self.titles_url}?year=1997', etag)
+
+    def test_writes_change_validators(self):
+        titles_etag = self.assert_not_modified(self.titles_url)
+        title_etag = self.assert_not_modified(self.title_url, num_queries=1)
+        reviews_etag = self.assert_not_modified(self.reviews_url)
+        comments_etag = self.assert_not_modified(self.comments_url)
+
+        Comment.objects.create(
+            reviews=self.review, author=self.user, text='Комментарий'
+        )
+        self.assert_modified(self.comments_url, comments_etag)
+        self.assert_not_modified(self.reviews_url)
+
+        # Версию списка произведений сдвигает сигнал сохранения отзыва.
+        self.review.text = 'Новый текст'
+        self.review.save()
+        self.assert_modified(self.reviews_url, reviews_etag)
+        self.assert_modified(self.titles_url, titles_etag)
+        self.assert_not_modified(self.title_url, num_queries=1)
+
+        # update_rating сам меняет только modified произведения.
+        Title.objects.filter(pk=self.title.pk).update_rating(0, 0)
+        self.assert_modified(self.title_url, title_etag)
+
+    def test_genre_changes_touch_title(self):
+        title_etag = self.assert_not_modified(self.title_url, num_queries=1)
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        self.title.genre.add(genre)
+        self.assert_modified(self.title_url, title_etag)
+
+        title_etag = self.assert_not_modified(self.title_url, num_queries=1)
+        genre.name = 'Мелодрама'
+        genre.save()
+        self.assert_modified(self.title_url, title_etag)
+
+    def test_if_modified_since(self):
+        response = self.client.get(self.title_url)
+        last_modified = response['Last-Modified']
+        response = self.client.get(
+            self.title_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_title(self):
+        response = self.client.get('/api/v1/titles/0/')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('ETag', response)
+
+    def test_rebuild_ratings_touches_only_drifted_titles(self):
+        other = Title.objects.create(name='Без отзывов', year=2000)
+        modified = self.title.modified
+        self.assertEqual(Title.objects.rebuild_ratings(), 1)
+        self.title.refresh_from_db()
+        self.assertEqual(self.title.rating, 8)
+        self.assertGreater(self.title.modified, modified)
+        self.assertEqual(
+            Title.objects.get(pk=other.pk).modified, other.modified
+        )
+        self.assertEqual(Title.objects.rebuild_ratings(), 0)
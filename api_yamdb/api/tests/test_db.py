@@ -0,0 +1,73 @@
+from unittest import skipUnless
+
+from django.db import OperationalError, connection
+from django.test import SimpleTestCase, TransactionTestCase
+from rest_framework.test import APIClient
+
+from api_yamdb.db.health import COUNTERS
+from api_yamdb.db.pool import ConnectionPool
+
+postgresql_only = skipUnless(
+    connection.vendor == 'postgresql', 'проверяется только на PostgreSQL'
+)
+
+
+@postgresql_only
+class HealthCheckTests(TransactionTestCase):
+    """Оборванное постоянное соединение заменяется до запроса."""
+
+    def test_broken_connection_is_replaced(self):
+        connection.ensure_connection()
+        connection.connection.close()
+        reconnects = COUNTERS['reconnects']
+        response = APIClient().get('/api/v1/genres/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(COUNTERS['reconnects'], reconnects + 1)
+
+
+@postgresql_only
+class ConnectionPoolTests(SimpleTestCase):
+    """Размер пула, ожидание свободного соединения и счётчики."""
+
+    def setUp(self):
+        params = connection.get_connection_params()
+        self.pool = ConnectionPool(
+            lambda: connection.get_new_connection(params), 1, 0.05
+        )
+        self.addCleanup(self.pool.close_idle)
+
+    def test_connection_is_reused(self):
+        first = self.pool.checkout()
+        self.pool.checkin(first)
+        self.assertIs(self.pool.checkout(), first)
+        self.assertEqual(self.pool.counters['connects'], 1)
+        self.pool.checkin(first)
+
+    def test_exhausted_pool_times_out(self):
+        first = self.pool.checkout()
+        with self.assertRaises(OperationalError):
+            self.pool.checkout()
+        self.pool.checkin(first)
+        self.assertEqual(self.pool.counters['waits'], 1)
+        self.assertEqual(self.pool.counters['timeouts'], 1)
+        self.assertEqual(self.pool.stats()['idle'], 1)
+
+    def test_broken_connections_are_dropped(self):
+        first = self.pool.checkout()
+        first.close()
+        self.pool.checkin(first)
+        self.assertEqual(self.pool.stats()['size'], 0)
+        second = self.pool.checkout()
+        self.pool.checkin(second)
+        second.close()
+        third = self.pool.checkout()
+        self.assertIsNot(third, second)
+        self.assertEqual(self.pool.counters['reconnects'], 1)
+        self.pool.checkin(third)
+
+    def test_open_transaction_is_rolled_back(self):
+        first = self.pool.checkout()
+        first.cursor().execute('SELECT 1')
+        self.pool.checkin(first)
+        self.assertIs(self.pool.checkout(), first)
+        self.pool.checkin(first)
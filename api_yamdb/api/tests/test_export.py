@@ -0,0 +1,92 @@
+import csv
+import io
+import json
+
+from django.test import TestCase
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Review, Title, User
+
+
+class ExportTests(TestCase):
+    """Потоковая выгрузка каталога администратору."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(
+            username='admin', email='a@ya.ru', role=User.ADMIN
+        )
+        critic = User.objects.create(username='critic', email='c@ya.ru')
+        movie = Category.objects.create(name='Фильм', slug='movie')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        cls.titles = [
+            Title.objects.create(name=f'Произведение {i}', year=2000 + i)
+            for i in range(5)
+        ]
+        cls.titles[0].genre.set([drama, comedy])
+        cls.titles[3].genre.set([comedy])
+        cls.titles[3].category = movie
+        cls.titles[3].save()
+        for title in cls.titles[1:4]:
+            Review.objects.create(
+                title=title, author=critic, text='Отзыв', score=7
+            )
+        Review.objects.create(
+            title=cls.titles[3], author=cls.admin, text='Ещё', score=9
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def content(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode()
+
+    def test_titles_ndjson_with_reviews(self):
+        with self.assertNumQueries(5):
+            lines = self.content('/api/v1/export/titles/?reviews=true')
+        titles = [json.loads(line) for line in lines.splitlines()]
+        self.assertEqual(
+            [title['id'] for title in titles],
+            [title.pk for title in self.titles]
+        )
+        self.assertEqual(
+            [genre['slug'] for genre in titles[0]['genre']],
+            ['drama', 'comedy']
+        )
+        self.assertEqual(titles[3]['category'],
+                         {'name': 'Фильм', 'slug': 'movie'})
+        self.assertEqual(
+            [len(title['reviews']) for title in titles], [0, 1, 1, 2, 0]
+        )
+        self.assertEqual(titles[3]['reviews'][1]['author'], 'admin')
+
+    def test_csv_matches_import_columns(self):
+        rows = list(csv.DictReader(io.StringIO(
+            self.content('/api/v1/export/titles/?output=csv')
+        )))
+        self.assertEqual(rows[0]['genre'], 'drama,comedy')
+        self.assertEqual(rows[3]['category'], 'movie')
+        reviews = list(csv.DictReader(io.StringIO(
+            self.content('/api/v1/export/reviews/?output=csv')
+        )))
+        self.assertEqual(len(reviews), 4)
+        self.assertEqual(reviews[0]['author'], 'critic')
+
+    def test_admin_only(self):
+        self.client.force_authenticate(None)
+        self.assertEqual(
+            self.client.get('/api/v1/export/titles/').status_code, 401
+        )
+        self.client.force_authenticate(User.objects.get(username='critic'))
+        self.assertEqual(
+            self.client.get('/api/v1/export/reviews/').status_code, 403
+        )
+
+    def test_bad_output(self):
+        for url in ('/api/v1/export/titles/?output=xml',
+                    '/api/v1/export/titles/?output=csv&reviews=true'):
+            self.assertEqual(self.client.get(url).status_code, 400)
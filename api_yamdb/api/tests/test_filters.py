@@ -0,0 +1,58 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Title
+
+
+class TitleFilterTests(TestCase):
+    """Точные фильтры по слагам жанров и категорий."""
+
+    @classmethod
+    def setUpTestData(cls):
+        movie = Category.objects.create(name='Фильм', slug='movie')
+        book = Category.objects.create(name='Книга', slug='book')
+        drama = Genre.objects.create(name='Драма', slug='drama')
+        comedy = Genre.objects.create(name='Комедия', slug='comedy')
+        Genre.objects.create(name='Мелодрама', slug='melodrama')
+        Title.objects.create(
+            name='Драма', year=2000, category=movie
+        ).genre.set([drama])
+        Title.objects.create(
+            name='Комедия', year=2001, category=book
+        ).genre.set([comedy])
+        Title.objects.create(
+            name='Трагикомедия', year=2002, category=movie
+        ).genre.set([drama, comedy])
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def names(self, **params):
+        response = self.client.get('/api/v1/titles/', params)
+        self.assertEqual(response.status_code, 200)
+        return [title['name'] for title in response.json()['results']]
+
+    def test_exact_slug_does_not_match_substrings(self):
+        self.assertEqual(self.names(genre='drama'), ['Драма', 'Трагикомедия'])
+        self.assertEqual(self.names(genre='dram'), [])
+
+    def test_any_of_several_genres_without_duplicates(self):
+        self.assertEqual(
+            self.names(genre='drama,comedy'),
+            ['Драма', 'Комедия', 'Трагикомедия']
+        )
+
+    def test_all_genres(self):
+        self.assertEqual(
+            self.names(genre='drama,comedy', genre_match='all'),
+            ['Трагикомедия']
+        )
+
+    def test_several_categories(self):
+        self.assertEqual(self.names(category='book'), ['Комедия'])
+        self.assertEqual(len(self.names(category='book,movie')), 3)
+
+    def test_substring_lookups_stay_available(self):
+        self.assertEqual(
+            self.names(genre__icontains='dram'), ['Драма', 'Трагикомедия']
+        )
+        self.assertEqual(self.names(category__icontains='boo'), ['Комедия'])
@@ -0,0 +1,61 @@
+import io
+
+from django.core.management import call_command
+from django.db.models import Count
+from django.test import TestCase
+from reviews.models import (Category, Comment, Genre, Leaderboard, Review,
+                            Title, User)
+
+
+def generate(**options):
+    call_command(
+        'generate_dataset', users=40, categories=3, genres=5, titles=60,
+        reviews=400, comments=300, stdout=io.StringIO(), **options
+    )
+
+
+def snapshot():
+    return (
+        list(User.objects.order_by('pk').values_list('username', 'email')),
+        list(Title.objects.order_by('pk').values_list(
+            'name', 'category__slug', 'rating')),
+        list(Review.objects.order_by('pk').values_list(
+            'title_id', 'author_id', 'score', 'pub_date')),
+        list(Comment.objects.order_by('pk').values_list(
+            'reviews_id', 'author_id', 'text')),
+    )
+
+
+class GenerateDatasetTests(TestCase):
+    """Синтетический каталог: объём, перекос и воспроизводимость."""
+
+    def test_volume_and_skew(self):
+        generate()
+        self.assertEqual(User.objects.count(), 40)
+        self.assertEqual(Title.objects.count(), 60)
+        self.assertEqual(Comment.objects.count(), 300)
+        self.assertEqual(Category.objects.count(), 3)
+        self.assertEqual(Genre.objects.count(), 5)
+        # У произведения не больше отзывов, чем пользователей.
+        counts = sorted(Review.objects.order_by().values('title_id').annotate(
+            count=Count('id')
+        ).values_list('count', flat=True), reverse=True)
+        self.assertLessEqual(counts[0], 40)
+        self.assertGreater(sum(counts[:6]), sum(counts) / 3)
+        self.assertEqual(Title.objects.rebuild_ratings(), 0)
+        self.assertTrue(Leaderboard.objects.exists())
+
+    def test_same_seed_same_data(self):
+        generate(seed=7)
+        first = snapshot()
+        for model in (Comment, Review, Title, User, Category, Genre):
+            model.objects.all().delete()
+        generate(seed=7)
+        self.assertEqual(snapshot(), first)
+
+    def test_appends_to_existing_data(self):
+        generate()
+        generate(seed=1)
+        self.assertEqual(User.objects.count(), 80)
+        self.assertEqual(Comment.objects.count(), 600)
+        User.objects.create(username='new', email='new@ya.ru')
@@ -0,0 +1,103 @@
+import io
+import json
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.test import TestCase
+from reviews.models import Category, Comment, Leaderboard, Review, Title, User
+
+
+class ImportCommandTests(TestCase):
+    """Загрузка каталога командой import_yamdb."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def test_import_resolves_references_and_rebuilds_rating(self):
+        reviews = [
+            {'id': 1, 'title_id': 10, 'author': 'critic', 'text': 'Да',
+             'score': 8, 'pub_date': '2020-01-01T10:00:00Z'},
+            {'id': 2, 'title_id': 10, 'author': 'reader', 'text': 'Нет',
+             'score': 3},
+            {'id': 3, 'title_id': 10, 'author': 'nobody', 'text': 'Нет',
+             'score': 3},
+        ]
+        stderr = io.StringIO()
+        call_command(
+            'import_yamdb',
+            users=self.write('users.csv', (
+                'username,email,role\n'
+                'critic,critic@ya.ru,moderator\n'
+                'reader,reader@ya.ru,\n'
+            )),
+            categories=self.write('category.csv', 'name,slug\nФильм,movie\n'),
+            genres=self.write('genre.ndjson', (
+                '{"name": "Драма", "slug": "drama"}\n'
+                '{"name": "Комедия", "slug": "comedy"}\n'
+            )),
+            titles=self.write('titles.csv', (
+                'id,name,year,category,genre\n'
+                '10,Титаник,1997,movie,"drama,comedy"\n'
+                '11,Аватар,2009,,\n'
+            )),
+            reviews=self.write('review.ndjson', '\n'.join(
+                json.dumps(review) for review in reviews
+            )),
+            comments=self.write('comments.csv', (
+                'id,review_id,author,text\n'
+                '5,1,reader,Согласен\n'
+            )),
+            batch_size=1, chunk_size=2, stdout=io.StringIO(), stderr=stderr,
+        )
+        self.assertIn('nobody', stderr.getvalue())
+        title = Title.objects.get(pk=10)
+        self.assertEqual(
+            (title.rating, title.reviews_count, title.category.slug),
+            (5.5, 2, 'movie')
+        )
+        self.assertEqual(
+            sorted(title.genre.values_list('slug', flat=True)),
+            ['comedy', 'drama']
+        )
+        self.assertIsNone(Title.objects.get(pk=11).rating)
+        self.assertTrue(Leaderboard.objects.filter(title_id=10).exists())
+        self.assertEqual(
+            Review.objects.get(pk=1).pub_date.isoformat(),
+            '2020-01-01T10:00:00+00:00'
+        )
+        self.assertEqual(Comment.objects.get().author.username, 'reader')
+        self.assertFalse(User.objects.get(username='critic')
+                         .has_usable_password())
+        # Последовательности сдвинуты за явные id.
+        self.assertGreater(
+            Title.objects.create(name='Новое', year=2020).pk, 11
+        )
+
+    def test_malformed_ndjson_lines_are_skipped(self):
+        stderr = io.StringIO()
+        call_command(
+            'import_yamdb',
+            categories=self.write('category.ndjson', (
+                '{"name": "Фильм", "slug": "movie"}\n'
+                '{"name": "Книга", "slug"\n'
+                '[1]\n'
+                '"x"\n'
+                '{"name": "Музыка", "slug": "music"}\n'
+            )),
+            stdout=io.StringIO(), stderr=stderr,
+        )
+        self.assertEqual(
+            sorted(Category.objects.values_list('slug', flat=True)),
+            ['movie', 'music']
+        )
+        for line_num in (2, 3, 4):
+            self.assertIn(f'category.ndjson:{line_num}: пропущено',
+                          stderr.getvalue())
@@ -0,0 +1,90 @@
+import io
+import tempfile
+from datetime import timedelta
+
+from django.core import mail
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from jobs.models import Job
+from jobs.queue import HANDLERS, claim, enqueue, run_job
+from rest_framework.test import APIClient
+
+SHARED_CACHE = {'default': {
+    'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+    'LOCATION': tempfile.mkdtemp(),
+}}
+
+
+def run_workers():
+    call_command('run_workers', once=True, stdout=io.StringIO())
+
+
+@override_settings(CACHES=SHARED_CACHE)
+class SignupEmailJobTests(TransactionTestCase):
+    """Письмо с кодом отправляется фоновой задачей, а не в запросе.
+
+    Обработчик между пачками закрывает соединения с БД, поэтому тест
+    не должен выполняться внутри транзакции.
+    """
+
+    def test_signup_enqueues_email(self):
+        response = APIClient().post(
+            '/api/v1/auth/signup/',
+            {'username': 'reader', 'email': 'reader@ya.ru'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        job = Job.objects.get()
+        self.assertEqual(job.name, 'send_confirmation_code')
+
+        run_workers()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(mail.outbox[0].to, ['reader@ya.ru'])
+
+    def test_invalid_signup_enqueues_nothing(self):
+        APIClient().post('/api/v1/auth/signup/', {'username': 'reader'})
+        self.assertFalse(Job.objects.exists())
+
+    def test_refuses_process_local_cache(self):
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }}), self.assertRaises(ImproperlyConfigured):
+            run_workers()
+
+
+@override_settings(JOBS_BACKOFF_BASE=10, JOBS_BACKOFF_MAX=30)
+class RetryTests(TestCase):
+    """Повторы с растущей задержкой и статус dead после предела попыток."""
+
+    def setUp(self):
+        def flaky(payload):
+            raise ConnectionError('SMTP недоступен')
+        HANDLERS['flaky'] = flaky
+        self.addCleanup(HANDLERS.pop, 'flaky')
+
+    def test_backoff_then_dead(self):
+        job = enqueue('flaky', max_attempts=3)
+        delays = []
+        with self.assertLogs('jobs.queue', 'ERROR'):
+            for _ in range(3):
+                Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+                started = timezone.now()
+                [claimed] = claim('test', 10)
+                self.assertFalse(run_job(claimed))
+                delays.append(claimed.run_at - started)
+        self.assertEqual(claimed.status, Job.DEAD)
+        self.assertIn('SMTP недоступен', claimed.last_error)
+        self.assertGreaterEqual(delays[0], timedelta(seconds=10))
+        self.assertGreaterEqual(delays[1], timedelta(seconds=20))
+        self.assertEqual(claim('test', 10), [])
+
+    def test_future_jobs_wait(self):
+        enqueue('flaky', delay=60)
+        self.assertEqual(claim('test', 10), [])
+
+    def test_unknown_job_type(self):
+        with self.assertRaises(ValueError):
+            enqueue('missing')
@@ -0,0 +1,155 @@
+import io
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from jobs.models import Job
+from jobs.queue import run_job
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Leaderboard, Review, Title, User
+
+
+def run_jobs():
+    for job in Job.objects.filter(status=Job.PENDING):
+        run_job(job)
+
+
+class LeaderboardTests(TestCase):
+    """Рейтинги по категориям и жанрам: байесовский балл, пересчёт
+    после записи отзыва и полная пересборка."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.films = Category.objects.create(name='Фильмы', slug='films')
+        cls.books = Category.objects.create(name='Книги', slug='books')
+        cls.drama = Genre.objects.create(name='Драма', slug='drama')
+        Genre.objects.create(name='Комедия', slug='comedy')
+        cls.users = [
+            User.objects.create(username=f'user{i}', email=f'{i}@ya.ru')
+            for i in range(12)
+        ]
+        cls.flop = Title.objects.create(
+            name='Провал', year=2002, category=cls.books
+        )
+        cls.lucky = Title.objects.create(
+            name='Одна десятка', year=2000, category=cls.films
+        )
+        cls.solid = Title.objects.create(
+            name='Много девяток', year=2001, category=cls.films
+        )
+        cls.lucky.genre.set([cls.drama])
+        cls.solid.genre.set([cls.drama])
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def review(self, title, user, score):
+        self.client.force_authenticate(user)
+        response = self.client.post(
+            f'/api/v1/titles/{title.pk}/reviews/',
+            {'text': 'Отзыв', 'score': score}
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()['id']
+
+    def board(self, board, scope, slug):
+        # Ответы анонимам кэшируются до коммита, которого в тесте нет.
+        cache.clear()
+        self.client.force_authenticate(None)
+        response = self.client.get(
+            f'/api/v1/leaderboards/{board}/{scope}/{slug}/'
+        )
+        self.assertEqual(response.status_code, 200)
+        return [
+            (row['title']['name'], round(row['score'], 2))
+            for row in response.json()['results']
+        ]
+
+    def test_few_reviews_do_not_dominate(self):
+        self.review(self.lucky, self.users[0], 10)
+        for user in self.users[1:]:
+            self.review(self.solid, user, 9)
+            self.review(self.flop, user, 2)
+        call_command('rebuild_leaderboards', stdout=io.StringIO())
+        # Средняя (10 + 11 * 9 + 11 * 2) / 23, к отзывам добавляется
+        # 10 таких.
+        mean = 131 / 23
+        expected = [
+            ('Много девяток', round((10 * mean + 99) / 21, 2)),
+            ('Одна десятка', round((10 * mean + 10) / 11, 2)),
+        ]
+        self.assertEqual(self.board('top', 'category', 'films'), expected)
+        self.assertEqual(self.board('top', 'genre', 'drama'), expected)
+        self.assertEqual(self.board('trending', 'genre', 'drama'), [
+            ('Много девяток', 11), ('Одна десятка', 1),
+        ])
+        self.assertEqual(self.board('trending', 'category', 'books'), [
+            ('Провал', 11),
+        ])
+        self.assertEqual(self.board('top', 'genre', 'comedy'), [])
+
+    def test_review_writes_refresh_the_title(self):
+        review_id = self.review(self.lucky, self.users[0], 7)
+        run_jobs()
+        self.assertEqual(
+            [name for name, _ in self.board('top', 'genre', 'drama')],
+            ['Одна десятка']
+        )
+        self.client.force_authenticate(self.users[0])
+        self.client.delete(
+            f'/api/v1/titles/{self.lucky.pk}/reviews/{review_id}/'
+        )
+        run_jobs()
+        self.assertEqual(self.board('top', 'genre', 'drama'), [])
+        self.assertEqual(Job.objects.filter(status=Job.DONE).count(), 2)
+
+    def test_title_moves_with_its_category_and_genres(self):
+        self.review(self.lucky, self.users[0], 8)
+        run_jobs()
+        self.lucky.refresh_from_db()
+        self.lucky.category = self.books
+        self.lucky.save()
+        self.lucky.genre.clear()
+        run_jobs()
+        self.assertEqual(self.board('top', 'category', 'films'), [])
+        self.assertEqual(
+            [name for name, _ in self.board('top', 'category', 'books')],
+            ['Одна десятка']
+        )
+        self.assertEqual(self.board('top', 'genre', 'drama'), [])
+        self.books.delete()
+        self.assertFalse(Leaderboard.objects.exists())
+
+    def test_refresh_uses_mean_of_last_rebuild(self):
+        self.review(self.solid, self.users[0], 9)
+        call_command('rebuild_leaderboards', stdout=io.StringIO())
+        # Задачу выполняет другой процесс: его кэш пуст.
+        cache.clear()
+        self.review(self.lucky, self.users[1], 1)
+        run_jobs()
+        self.assertEqual(self.board('top', 'genre', 'drama'), [
+            ('Много девяток', 9.0), ('Одна десятка', round(91 / 11, 2)),
+        ])
+
+    def test_rebuild_drops_old_reviews_from_trending(self):
+        Review.objects.create(
+            title=self.solid, author=self.users[0], text='Старый', score=5
+        )
+        Review.objects.update(pub_date=timezone.now() - timedelta(days=30))
+        Title.objects.rebuild_ratings()
+        call_command('rebuild_leaderboards', stdout=io.StringIO())
+        self.assertEqual(self.board('trending', 'category', 'films'), [])
+        self.assertEqual(len(self.board('top', 'category', 'films')), 1)
+
+    def test_unknown_board_or_scope(self):
+        self.assertEqual(
+            self.client.get('/api/v1/leaderboards/top/genre/nope/')
+            .status_code, 404
+        )
+        self.assertEqual(
+            self.client.get('/api/v1/leaderboards/worst/genre/drama/')
+            .status_code, 404
+        )
@@ -0,0 +1,139 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from api.metrics import REGISTRY, prune_snapshots
+from api.serializers import CategorySerializer
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import serializers
+from rest_framework.test import APIClient
+from reviews.models import Category, Title, User
+
+METRICS_DIR = tempfile.mkdtemp()
+
+
+@override_settings(METRICS_DIR=METRICS_DIR, METRICS_TOKEN='secret')
+class MetricsTests(TestCase):
+    """Метрики по представлениям, сложенные по всем процессам."""
+
+    def setUp(self):
+        cache.clear()
+        REGISTRY.values.clear()
+        shutil.rmtree(METRICS_DIR, ignore_errors=True)
+        self.addCleanup(shutil.rmtree, METRICS_DIR, ignore_errors=True)
+        self.client = APIClient()
+
+    def scrape(self):
+        response = self.client.get(
+            '/metrics', HTTP_AUTHORIZATION='Token secret'
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_view_metrics(self):
+        Category.objects.create(name='Фильмы', slug='films')
+        self.client.get('/api/v1/categories/')
+        self.client.get('/api/v1/titles/404/')
+        text = self.scrape()
+        view = 'view="CategoryViewSet.list"'
+        self.assertIn(f'yamdb_requests_total{{{view},status="200"}} 1', text)
+        self.assertIn('yamdb_requests_total{view="TitleViewSet.retrieve",'
+                      'status="404"} 1', text)
+        self.assertIn(f'yamdb_db_queries_bucket{{{view},le="1"}} 0', text)
+        self.assertIn(f'yamdb_db_queries_bucket{{{view},le="2"}} 1', text)
+        self.assertIn(f'yamdb_db_queries_sum{{{view}}} 2', text)
+        size = next(
+            line for line in text.splitlines()
+            if line.startswith(f'yamdb_response_size_bytes_sum{{{view}}}')
+        )
+        self.assertGreater(float(size.split()[-1]), 0)
+        self.assertIn(
+            f'yamdb_serialization_duration_seconds_count{{{view}}} 1', text
+        )
+        serialization = next(
+            line for line in text.splitlines() if line.startswith(
+                f'yamdb_serialization_duration_seconds_sum{{{view}}}'
+            )
+        )
+        self.assertGreater(float(serialization.split()[-1]), 0)
+
+    def test_streaming_response_is_measured_to_the_end(self):
+        admin = User.objects.create(
+            username='admin', email='a@ya.ru', role=User.ADMIN
+        )
+        Title.objects.create(name='Титаник', year=1997)
+        self.client.force_authenticate(admin)
+        response = self.client.get('/api/v1/export/titles/')
+        body = b''.join(response.streaming_content)
+        text = self.scrape()
+        view = 'view="export_titles.get"'
+        self.assertIn(
+            f'yamdb_response_size_bytes_sum{{{view}}} {len(body)}', text
+        )
+        self.assertNotIn(f'yamdb_db_queries_bucket{{{view},le="0"}} 1', text)
+
+    def test_snapshots_of_other_processes_are_summed(self):
+        self.client.get('/api/v1/genres/')
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        with open(os.path.join(METRICS_DIR, '1.json'), 'w') as output:
+            json.dump([[
+                'yamdb_requests_total',
+                [['view', 'GenreViewSet.list'], ['status', '200']], 4
+            ]], output)
+        self.assertIn(
+            'yamdb_requests_total{view="GenreViewSet.list",status="200"} 5',
+            self.scrape()
+        )
+
+    def test_access(self):
+        self.assertIn(self.client.get('/metrics').status_code, (401, 403))
+        response = self.client.get(
+            '/metrics', HTTP_AUTHORIZATION='Token wrong'
+        )
+        self.assertIn(response.status_code, (401, 403))
+        self.client.force_authenticate(
+            User.objects.create(username='u', email='u@ya.ru')
+        )
+        self.assertEqual(self.client.get('/metrics').status_code, 403)
+        self.client.force_authenticate(User.objects.create(
+            username='admin', email='a@ya.ru', role=User.ADMIN
+        ))
+        self.assertEqual(self.client.get('/metrics').status_code, 200)
+
+    def test_only_serving_processes_write_snapshots(self):
+        self.client.get('/api/v1/genres/')
+        self.assertFalse(os.path.exists(METRICS_DIR))
+        with mock.patch.object(REGISTRY, 'serving', True):
+            self.client.get('/api/v1/genres/')
+            self.assertIn('yamdb_requests_total{view="GenreViewSet.list",'
+                          'status="200"} 2', self.scrape())
+        names = os.listdir(METRICS_DIR)
+        self.assertEqual(names, [REGISTRY.snapshot_name()])
+        self.assertTrue(names[0].startswith(f'{os.getpid()}-'))
+
+    def test_stale_snapshots_are_pruned(self):
+        os.makedirs(METRICS_DIR)
+        for name in ('old.json', 'fresh.json'):
+            with open(os.path.join(METRICS_DIR, name), 'w') as output:
+                json.dump([], output)
+        stale = time.time() - 2 * 86400
+        os.utime(os.path.join(METRICS_DIR, 'old.json'), (stale, stale))
+        with self.settings(METRICS_SNAPSHOT_MAX_AGE=86400):
+            prune_snapshots()
+        self.assertEqual(os.listdir(METRICS_DIR), ['fresh.json'])
+
+    def test_serializers_outside_requests_are_not_measured(self):
+        # Базовый класс DRF не подменяется, а вне запроса метрик нет.
+        self.assertEqual(
+            serializers.BaseSerializer.data.fget.__module__,
+            'rest_framework.serializers'
+        )
+        data = CategorySerializer(
+            Category(name='Фильмы', slug='films')
+        ).data
+        self.assertEqual(data, {'name': 'Фильмы', 'slug': 'films'})
+        self.assertEqual(REGISTRY.values, {})
@@ -0,0 +1,73 @@
+from unittest import mock
+
+from api.serializers import ReviewSerializer
+from django.db import IntegrityError, connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import Review, Title, User
+
+
+class NestedParentTests(TestCase):
+    """Родитель вложенного ресурса ищется один раз, уникальность
+    отзыва проверяет индекс БД."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='critic', email='c@ya.ru')
+        cls.title = Title.objects.create(name='Титаник', year=1997)
+        cls.url = f'/api/v1/titles/{cls.title.pk}/reviews/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def post_review(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, {'text': 'Да', 'score': 8})
+        selects = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT')
+        ]
+        return response, selects
+
+    def test_create_looks_up_title_once(self):
+        response, selects = self.post_review()
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(selects), 1)
+        self.assertEqual(Title.objects.get().rating, 8.0)
+
+    def test_second_review_is_rejected_by_constraint(self):
+        self.post_review()
+        response, selects = self.post_review()
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {
+            'non_field_errors': ['Можно оставлять только одно ревью к тайтлу']
+        })
+        self.assertEqual(len(selects), 1)
+        title = Title.objects.get()
+        self.assertEqual((title.reviews_count, title.rating), (1, 8.0))
+
+    def test_other_integrity_errors_are_not_masked(self):
+        error = IntegrityError('FOREIGN KEY constraint failed')
+        with mock.patch.object(ReviewSerializer, 'save', side_effect=error):
+            with self.assertRaises(IntegrityError):
+                self.post_review()
+
+    def test_missing_parents(self):
+        self.assertEqual(
+            self.client.get('/api/v1/titles/0/reviews/').status_code, 404
+        )
+        review = Review.objects.create(
+            title=self.title, author=self.user, text='Да', score=8
+        )
+        other = Title.objects.create(name='Аватар', year=2009)
+        response = self.client.post(
+            f'/api/v1/titles/{other.pk}/reviews/{review.pk}/comments/',
+            {'text': 'Комментарий'}
+        )
+        self.assertEqual(response.status_code, 404)
+        response = self.client.post(
+            f'{self.url}{review.pk}/comments/', {'text': 'Комментарий'}
+        )
+        self.assertEqual(response.status_code, 201)
@@ -0,0 +1,95 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import Comment, Review, Title, User
+
+
+class CursorPaginationTests(TestCase):
+    """Курсорная навигация по отзывам и комментариям включается явно."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.title = Title.objects.create(name='Титаник', year=1997)
+        authors = [
+            User.objects.create(username=f'user{i}', email=f'u{i}@ya.ru')
+            for i in range(25)
+        ]
+        Review.objects.bulk_create(
+            Review(title=cls.title, author=author, text='Отзыв', score=5)
+            for author in authors
+        )
+        cls.review = Review.objects.first()
+        Comment.objects.bulk_create(
+            Comment(reviews=cls.review, author=author, text='Комментарий')
+            for author in authors
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.reviews_url = f'/api/v1/titles/{self.title.pk}/reviews/'
+        self.comments_url = f'{self.reviews_url}{self.review.pk}/comments/'
+
+    def walk(self, url):
+        ids = []
+        while url:
+            with self.assertNumQueries(2):
+                data = self.client.get(url).json()
+            self.assertNotIn('count', data)
+            ids.extend(item['id'] for item in data['results'])
+            url = data['next']
+        return ids
+
+    def test_cursor_walks_all_items(self):
+        self.assertEqual(
+            self.walk(f'{self.reviews_url}?pagination=cursor'),
+            list(Review.objects.order_by('pub_date', 'id')
+                 .values_list('id', flat=True))
+        )
+        self.assertEqual(
+            len(self.walk(f'{self.comments_url}?pagination=cursor')), 25
+        )
+
+    def test_page_number_is_default(self):
+        data = self.client.get(f'{self.reviews_url}?page=3').json()
+        self.assertEqual(data['count'], 25)
+        self.assertEqual(len(data['results']), 5)
+
+
+class EstimatedCountTests(TestCase):
+    """Большие выборки произведений не пересчитываются на каждый запрос."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Title.objects.bulk_create(
+            Title(name=f'Произведение {i}', year=2000 + i % 3)
+            for i in range(12)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create(username='reader', email='r@ya.ru')
+        )
+
+    def test_small_tables_keep_exact_count(self):
+        data = self.client.get('/api/v1/titles/').json()
+        self.assertEqual((data['count'], data['count_exact']), (12, True))
+
+    @override_settings(PAGINATION_COUNT_THRESHOLD=5)
+    def test_large_selection_skips_exact_count(self):
+        self.client.get('/api/v1/titles/')
+        with CaptureQueriesContext(connection) as queries:
+            data = self.client.get('/api/v1/titles/?page=2').json()
+        self.assertFalse(data['count_exact'])
+        self.assertFalse(any(
+            query['sql'].startswith('SELECT COUNT(*)') for query in queries
+        ))
+
+    @override_settings(PAGINATION_COUNT_THRESHOLD=5)
+    def test_filtered_below_threshold_is_exact(self):
+        self.client.get('/api/v1/titles/?year=2000')
+        data = self.client.get('/api/v1/titles/?year=2000').json()
+        self.assertEqual((data['count'], data['count_exact']), (4, True))
@@ -0,0 +1,155 @@
+from unittest import mock
+
+from api import conditional
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+
+class QueryCountTests(TestCase):
+    """Число запросов к БД на маршрутах чтения не зависит от числа строк."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(
+            username='admin', email='admin@yamdb.ru', role=User.ADMIN
+        )
+        authors = [
+            User.objects.create(username=f'user{i}', email=f'u{i}@yamdb.ru')
+            for i in range(3)
+        ]
+        categories = [
+            Category.objects.create(name=f'Категория {i}', slug=f'cat-{i}')
+            for i in range(2)
+        ]
+        genres = [
+            Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+            for i in range(3)
+        ]
+        for i in range(5):
+            title = Title.objects.create(
+                name=f'Произведение {i}', year=2000 + i,
+                category=categories[i % 2]
+            )
+            title.genre.set(genres[:i % 3 + 1])
+        cls.title = Title.objects.first()
+        for author in authors:
+            review = Review.objects.create(
+                title=cls.title, author=author, text='Отзыв', score=5
+            )
+            for commenter in authors:
+                Comment.objects.create(
+                    reviews=review, author=commenter, text='Комментарий'
+                )
+        cls.review = Review.objects.first()
+        cls.comment = Comment.objects.first()
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def get(self, url):
+        with mock.patch.object(conditional, 'get_version',
+                               wraps=conditional.get_version) as versions:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, url)
+        return len(queries), versions.call_count
+
+    def assert_queries(self, url, num, table_rows=0, versions=0):
+        """num запросов с тёплым кэшем; с пустым кэшем ещё table_rows
+        запросов размера таблицы. versions обращений к версиям ресурсов
+        идут только в кэш и запросов не добавляют."""
+        cache.clear()
+        self.assertEqual(self.get(url), (num + table_rows, versions), url)
+        self.assertEqual(self.get(url), (num, versions), url)
+
+    def test_users(self):
+        self.assert_queries('/api/v1/users/', 2)
+        self.assert_queries('/api/v1/users/user0/', 1)
+        self.assert_queries('/api/v1/users/me/', 0)
+
+    def test_categories_and_genres(self):
+        self.assert_queries('/api/v1/categories/', 2)
+        self.assert_queries('/api/v1/genres/', 2)
+
+    def test_titles(self):
+        self.assert_queries('/api/v1/titles/', 3, table_rows=1, versions=1)
+        self.assert_queries('/api/v1/titles/?genre=genre-1&year=2001', 3,
+                            table_rows=1, versions=1)
+        self.assert_queries(f'/api/v1/titles/{self.title.pk}/', 3)
+
+    def test_reviews(self):
+        url = f'/api/v1/titles/{self.title.pk}/reviews/'
+        self.assert_queries(url, 3, versions=1)
+        self.assert_queries(f'{url}{self.review.pk}/', 2, versions=1)
+
+    def test_comments(self):
+        url = (f'/api/v1/titles/{self.title.pk}/reviews/'
+               f'{self.review.pk}/comments/')
+        self.assert_queries(url, 3, versions=1)
+        self.assert_queries(f'{url}{self.comment.pk}/', 2, versions=1)
+
+
+class QueryScalingTests(TestCase):
+    """Одна и та же страница на 1 и на 10 строк стоит одинаково."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(
+            User.objects.create(username='admin', email='a@yamdb.ru',
+                                role=User.ADMIN)
+        )
+        self.category = Category.objects.create(name='Фильм', slug='movie')
+        self.genres = [
+            Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+            for i in range(2)
+        ]
+        self.title = self.add_title(0)
+        self.review = None
+
+    def add_title(self, i):
+        title = Title.objects.create(name=f'Произведение {i}', year=2000,
+                                     category=self.category)
+        title.genre.set(self.genres)
+        return title
+
+    def add_rows(self, start, stop):
+        for i in range(start, stop):
+            if i:
+                self.add_title(i)
+            author = User.objects.create(username=f'user{i}',
+                                         email=f'u{i}@yamdb.ru')
+            review = Review.objects.create(
+                title=self.title, author=author, text='Отзыв', score=5
+            )
+            self.review = self.review or review
+            Comment.objects.create(reviews=self.review, author=author,
+                                   text='Комментарий')
+
+    def count_queries(self, rows):
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{self.title.pk}/reviews/',
+            f'/api/v1/titles/{self.title.pk}/reviews/'
+            f'{self.review.pk}/comments/',
+        )
+        counts = []
+        for url in urls:
+            cache.clear()
+            self.client.get(url)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertEqual(response.json()['count'], rows, url)
+            counts.append(len(queries))
+        return counts
+
+    def test_counts_do_not_depend_on_rows(self):
+        self.add_rows(0, 1)
+        one = self.count_queries(1)
+        self.add_rows(1, 10)
+        self.assertEqual(self.count_queries(10), one)
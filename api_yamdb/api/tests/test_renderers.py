@@ -0,0 +1,83 @@
+import json
+import uuid
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+import msgpack
+from api.renderers import FastJSONRenderer
+from django.test import TestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from reviews.models import Category, Genre, Review, Title, User
+
+
+class RendererTests(TestCase):
+    """orjson отдаёт те же байты, что JSONRenderer; MessagePack по Accept."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='critic', email='c@ya.ru')
+        cls.title = Title.objects.create(
+            name='Титаник — «фильм»\u2028', year=1997,
+            category=Category.objects.create(name='Фильмы', slug='films')
+        )
+        cls.title.genre.set([Genre.objects.create(name='Драма', slug='drama')])
+        Review.objects.create(
+            title=cls.title, author=cls.user, text='Отзыв', score=9
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_same_bytes_as_drf(self):
+        data = OrderedDict([
+            ('aware', datetime(2021, 5, 1, 12, 30, 5, 123456,
+                               tzinfo=timezone.utc)),
+            ('naive', datetime(2021, 5, 1, 12, 30)),
+            ('date', date(2021, 5, 1)),
+            ('decimal', Decimal('1.50')),
+            ('lazy', gettext_lazy('Ленивая строка')),
+            ('uuid', uuid.UUID(int=1)),
+            ('delta', timedelta(minutes=1)),
+            ('separators', 'a\u2028b\u2029c'),
+            ('nested', [{'rating': None, 'score': 9.5, 1: True}]),
+        ])
+        self.assertEqual(
+            FastJSONRenderer().render(data), JSONRenderer().render(data)
+        )
+
+    def test_api_responses(self):
+        for url in ('/api/v1/titles/',
+                    f'/api/v1/titles/{self.title.pk}/reviews/'):
+            response = self.client.get(url)
+            self.assertEqual(
+                response.content, JSONRenderer().render(response.data)
+            )
+            packed = self.client.get(url, HTTP_ACCEPT='application/msgpack')
+            self.assertEqual(packed['Content-Type'], 'application/msgpack')
+            self.assertEqual(msgpack.unpackb(packed.content),
+                             json.loads(response.content))
+        indented = self.client.get(
+            '/api/v1/titles/', HTTP_ACCEPT='application/json; indent=2'
+        )
+        self.assertIn(b'\n  "next"', indented.content)
+
+    def test_parsers(self):
+        other = Title.objects.create(name='Аватар', year=2009)
+        response = self.client.post(
+            f'/api/v1/titles/{other.pk}/reviews/',
+            msgpack.packb({'text': 'Отзыв', 'score': 7}),
+            content_type='application/msgpack'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()['score'], 7)
+        response = self.client.post(
+            f'/api/v1/titles/{other.pk}/reviews/', '{"text": ',
+            content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
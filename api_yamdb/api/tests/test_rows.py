@@ -0,0 +1,111 @@
+from api.serializers import (CommentSerializer, ReviewSerializer,
+                             TitleSerializer)
+from django.core.cache import cache
+from django.db import connection
+from django.db.models.signals import post_init
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+
+class RowListTests(TestCase):
+    """Списки из строк values() совпадают с ответом сериализаторов."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='critic', email='c@ya.ru')
+        reader = User.objects.create(username='reader', email='r@ya.ru')
+        cls.title = Title.objects.create(
+            name='Титаник', year=1997, description='Описание «фильма»',
+            category=Category.objects.create(name='Фильмы', slug='films')
+        )
+        cls.title.genre.set([
+            Genre.objects.create(name='Драма', slug='drama'),
+            Genre.objects.create(name='Мелодрама', slug='melodrama'),
+        ])
+        Title.objects.create(name='Без категории', year=2000)
+        cls.review = Review.objects.create(
+            title=cls.title, author=cls.user, text='Отзыв', score=9
+        )
+        Review.objects.create(
+            title=cls.title, author=reader, text='Второй', score=4
+        )
+        Title.objects.filter(pk=cls.title.pk).update_rating(13, 2)
+        Comment.objects.create(
+            reviews=cls.review, author=reader, text='Комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def assert_same_bytes(self, url, serializer_class, queryset):
+        # Родитель вложенного ресурса загружается как раньше.
+        instances = []
+        receiver = (lambda sender, instance, **kwargs:
+                    instances.append(instance))
+        post_init.connect(receiver, sender=queryset.model)
+        try:
+            response = self.client.get(url)
+        finally:
+            post_init.disconnect(receiver, sender=queryset.model)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(instances, [])
+        self.assertEqual(
+            JSONRenderer().render(response.data['results']),
+            JSONRenderer().render(serializer_class(queryset, many=True).data)
+        )
+        return response
+
+    def test_titles(self):
+        self.assert_same_bytes(
+            '/api/v1/titles/', TitleSerializer, Title.objects.all()
+        )
+        self.assert_same_bytes(
+            '/api/v1/titles/?genre=drama', TitleSerializer,
+            Title.objects.filter(pk=self.title.pk)
+        )
+
+    def test_reviews_and_comments(self):
+        url = f'/api/v1/titles/{self.title.pk}/reviews/'
+        self.assert_same_bytes(url, ReviewSerializer, self.title.reviews.all())
+        response = self.assert_same_bytes(
+            f'{url}?pagination=cursor', ReviewSerializer,
+            self.title.reviews.order_by('pub_date', 'id')
+        )
+        self.assertIsNone(response.data['next'])
+        self.assert_same_bytes(
+            f'{url}{self.review.pk}/comments/', CommentSerializer,
+            self.review.comments.all()
+        )
+
+    def test_count_without_joins(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f'/api/v1/titles/{self.title.pk}/reviews/')
+        counts = [query['sql'] for query in queries
+                  if 'COUNT(*)' in query['sql']]
+        self.assertEqual(len(counts), 1)
+        self.assertNotIn('reviews_user', counts[0])
+
+    @override_settings(PAGINATION_COUNT_THRESHOLD=1)
+    def test_estimated_count_without_joins(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/titles/')
+        self.assertEqual(response.status_code, 200)
+        # Точный count, EXPLAIN или кэшируемый COUNT(*) - в зависимости
+        # от СУБД, но всегда без соединения с категорией.
+        counts = [query['sql'] for query in queries
+                  if 'COUNT(*)' in query['sql']
+                  or query['sql'].startswith('EXPLAIN')]
+        self.assertTrue(counts)
+        for sql in counts:
+            self.assertNotIn('reviews_category', sql)
+
+    def test_sparse_fields(self):
+        response = self.client.get('/api/v1/titles/?fields=id,genre')
+        self.assertEqual(response.json()['results'], [
+            {'id': title['id'], 'genre': title['genre']}
+            for title in TitleSerializer(Title.objects.all(), many=True).data
+        ])
@@ -0,0 +1,53 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+from reviews.models import Title
+
+
+class TitleSearchTests(TestCase):
+    """Поиск по названию и описанию с ранжированием и префиксами."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Title.objects.create(
+            name='Война и мир', year=1869, description='Роман-эпопея'
+        )
+        Title.objects.create(
+            name='Мир приключений', year=1910, description='Альманах'
+        )
+        Title.objects.create(
+            name='Альманах', year=1950, description='Сборник про войну и мир'
+        )
+        Title.objects.create(name='Гарри Поттер', year=1997)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def search(self, text):
+        response = self.client.get('/api/v1/titles/', {'search': text})
+        self.assertEqual(response.status_code, 200)
+        return [title['name'] for title in response.json()['results']]
+
+    def test_name_matches_rank_above_description(self):
+        self.assertEqual(
+            self.search('альманах'), ['Альманах', 'Мир приключений']
+        )
+
+    def test_all_words_must_match(self):
+        self.assertEqual(self.search('война мир'), ['Война и мир'])
+
+    def test_last_word_is_prefix(self):
+        self.assertEqual(self.search('гарри пот'), ['Гарри Поттер'])
+        self.assertEqual(self.search('приключ'), ['Мир приключений'])
+
+    def test_updates_are_indexed(self):
+        title = Title.objects.get(name='Гарри Поттер')
+        title.name = 'Гарри Поттер и философский камень'
+        title.save()
+        self.assertEqual(
+            self.search('философ'), ['Гарри Поттер и философский камень']
+        )
+        title.delete()
+        self.assertEqual(self.search('гарри'), [])
+
+    def test_punctuation_only_query_is_ignored(self):
+        self.assertEqual(len(self.search('"*:')), 4)
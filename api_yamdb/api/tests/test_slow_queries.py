@@ -0,0 +1,73 @@
+import io
+import json
+import os
+import tempfile
+
+from api.slow_queries import LIMITER, log_slow_query, normalize
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from reviews.models import Category, Title
+
+SLOW_QUERY_LOG = os.path.join(tempfile.mkdtemp(), 'slow.log')
+
+
+@override_settings(SLOW_QUERY_MS=0, SLOW_QUERY_LOG=SLOW_QUERY_LOG,
+                   SLOW_QUERY_EXPLAIN_SAMPLE=1)
+class SlowQueryTests(TestCase):
+    """Журнал медленных запросов и его сводка."""
+
+    def setUp(self):
+        LIMITER.__init__()
+        if os.path.exists(SLOW_QUERY_LOG):
+            os.remove(SLOW_QUERY_LOG)
+        self.addCleanup(lambda: os.path.exists(SLOW_QUERY_LOG)
+                        and os.remove(SLOW_QUERY_LOG))
+        category = Category.objects.create(name='Фильмы', slug='films')
+        Title.objects.create(name='Титаник', year=1997, category=category)
+
+    def request(self, path):
+        with connection.execute_wrapper(log_slow_query):
+            response = APIClient().get(path)
+        self.assertEqual(response.status_code, 200)
+
+    def entries(self):
+        with open(SLOW_QUERY_LOG, encoding='utf-8') as source:
+            return [json.loads(line) for line in source]
+
+    def test_normalize(self):
+        self.assertEqual(
+            normalize("SELECT * FROM t WHERE id IN (%s, %s)\n LIMIT 10"),
+            normalize("SELECT * FROM t WHERE id IN (%s) LIMIT 20"),
+        )
+        self.assertEqual(
+            normalize("SELECT 'a''b', x1 FROM t WHERE y = 2.5"),
+            'SELECT ?, x1 FROM t WHERE y = ?'
+        )
+
+    def test_queries_are_logged_with_view_and_plan(self):
+        self.request('/api/v1/titles/?category=films')
+        self.request('/api/v1/titles/?category=music')
+        entries = [
+            entry for entry in self.entries()
+            if 'COUNT(*)' in entry['sql'] and entry['params']
+        ]
+        self.assertEqual(len(entries), 2)
+        self.assertEqual({entry['view'] for entry in entries},
+                         {'TitleViewSet.list'})
+        self.assertEqual(entries[0]['params'], ['films'])
+        self.assertEqual(entries[1]['params'], ['music'])
+        self.assertEqual(entries[0]['fingerprint'], entries[1]['fingerprint'])
+        if connection.vendor == 'postgresql':
+            # Один отпечаток объясняется не чаще раза в минуту.
+            self.assertIn('Scan', entries[0]['plan'])
+            self.assertIsNone(entries[1]['plan'])
+
+    def test_summary(self):
+        self.request('/api/v1/titles/')
+        self.request('/api/v1/genres/')
+        output = io.StringIO()
+        call_command('slow_queries', view='Genre', plans=True, stdout=output)
+        self.assertIn('GenreViewSet.list', output.getvalue())
+        self.assertNotIn('TitleViewSet', output.getvalue())
@@ -0,0 +1,87 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+
+class SparseFieldsTests(TestCase):
+    """?fields= и ?omit= сокращают и ответ, и запросы к БД."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='critic', email='c@ya.ru')
+        category = Category.objects.create(name='Фильмы', slug='films')
+        cls.title = Title.objects.create(
+            name='Титаник', year=1997, description='Длинное описание',
+            category=category
+        )
+        cls.title.genre.set([Genre.objects.create(name='Драма', slug='drama')])
+        cls.review = Review.objects.create(
+            title=cls.title, author=cls.user, text='Отзыв', score=9
+        )
+        Comment.objects.create(
+            reviews=cls.review, author=cls.user, text='Комментарий'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def get(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json(), ' '.join(query['sql'] for query in queries)
+
+    def test_title_fields(self):
+        data, sql = self.get('/api/v1/titles/?fields=id,name,rating')
+        self.assertEqual(data['results'], [
+            {'id': self.title.pk, 'name': 'Титаник', 'rating': None}
+        ])
+        self.assertNotIn('reviews_genre', sql)
+        self.assertNotIn('reviews_category', sql)
+        self.assertNotIn('description', sql)
+        data, sql = self.get(f'/api/v1/titles/{self.title.pk}/?omit=genre')
+        self.assertNotIn('genre', data)
+        self.assertEqual(data['category']['slug'], 'films')
+        self.assertNotIn('reviews_genre', sql)
+
+    def test_reviews_and_comments(self):
+        url = f'/api/v1/titles/{self.title.pk}/reviews/'
+        data, sql = self.get(f'{url}?fields=id,score')
+        self.assertEqual(data['results'], [{'id': self.review.pk, 'score': 9}])
+        self.assertNotIn('reviews_user', sql)
+        data, sql = self.get(
+            f'{url}{self.review.pk}/comments/?omit=author,pub_date'
+        )
+        self.assertEqual(set(data['results'][0]), {'id', 'text', 'reviews'})
+        self.assertNotIn('reviews_user', sql)
+
+    def test_unknown_field(self):
+        response = self.client.get('/api/v1/titles/?fields=id,secret')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {
+            'fields': ['Неизвестные поля: secret']
+        })
+
+    def test_cached_responses_differ_by_fields(self):
+        full, _ = self.get('/api/v1/titles/')
+        short, _ = self.get('/api/v1/titles/?fields=name')
+        self.assertEqual(short['results'], [{'name': 'Титаник'}])
+        self.assertIn('description', full['results'][0])
+        cached, sql = self.get('/api/v1/titles/?fields=name')
+        self.assertEqual(cached, short)
+        self.assertNotIn('reviews_title', sql)
+
+    def test_writes_ignore_fields(self):
+        self.client.force_authenticate(User.objects.create(
+            username='reader', email='r@ya.ru'
+        ))
+        response = self.client.post(
+            f'/api/v1/titles/{self.title.pk}/reviews/?fields=id',
+            {'text': 'Второй', 'score': 5}
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertIn('score', response.json())
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from reviews.models import Title, User
+
+RATES = {
+    'signup_ip': '100/hour',
+    'signup_username': '2/hour',
+    'token_ip': '3/min',
+    'token_username': '100/min',
+    'write_ip': '100/min',
+    'write_user': '2/min',
+}
+
+
+@override_settings(
+    REST_FRAMEWORK=dict(settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES=RATES)
+)
+class ThrottlingTests(TestCase):
+    """Корзины запросов на IP и пользователя для входа и записи."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def assert_throttled(self, response):
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+    def test_signup_per_username(self):
+        data = {'username': 'reader', 'email': 'reader@ya.ru'}
+        for _ in range(2):
+            self.client.post('/api/v1/auth/signup/', data)
+        self.assert_throttled(self.client.post('/api/v1/auth/signup/', {
+            'username': 'READER', 'email': 'other@ya.ru'
+        }))
+        response = self.client.post('/api/v1/auth/signup/', {
+            'username': 'writer', 'email': 'writer@ya.ru'
+        })
+        self.assertEqual(response.status_code, 200)
+
+    def test_token_per_ip_without_user_lookup(self):
+        for i in range(3):
+            self.client.post('/api/v1/auth/token/', {'username': f'u{i}'})
+        with self.assertNumQueries(0):
+            response = self.client.post(
+                '/api/v1/auth/token/', {'username': 'u9'},
+                REMOTE_ADDR='127.0.0.1'
+            )
+        self.assert_throttled(response)
+        response = self.client.post(
+            '/api/v1/auth/token/', {'username': 'u9'}, REMOTE_ADDR='10.0.0.2'
+        )
+        self.assertNotEqual(response.status_code, 429)
+
+    def test_forwarded_for_needs_trusted_proxy(self):
+        for address in ('1.1.1.1', '2.2.2.2', '3.3.3.3'):
+            self.client.post('/api/v1/auth/token/', {'username': 'u9'},
+                             HTTP_X_FORWARDED_FOR=address)
+        self.assert_throttled(self.client.post(
+            '/api/v1/auth/token/', {'username': 'u9'},
+            HTTP_X_FORWARDED_FOR='4.4.4.4'
+        ))
+        with self.settings(REST_FRAMEWORK=dict(
+            settings.REST_FRAMEWORK, DEFAULT_THROTTLE_RATES=RATES,
+            NUM_PROXIES=1
+        )):
+            response = self.client.post(
+                '/api/v1/auth/token/', {'username': 'u9'},
+                HTTP_X_FORWARDED_FOR='4.4.4.4, 10.0.0.3'
+            )
+        self.assertNotEqual(response.status_code, 429)
+
+    def test_review_create_per_user(self):
+        user = User.objects.create(username='critic', email='c@ya.ru')
+        self.client.force_authenticate(user)
+        titles = [
+            Title.objects.create(name=f'Произведение {i}', year=2000)
+            for i in range(3)
+        ]
+        for title in titles[:2]:
+            response = self.client.post(
+                f'/api/v1/titles/{title.pk}/reviews/',
+                {'text': 'Отзыв', 'score': 5}
+            )
+            self.assertEqual(response.status_code, 201)
+        self.assert_throttled(self.client.post(
+            f'/api/v1/titles/{titles[2].pk}/reviews/',
+            {'text': 'Отзыв', 'score': 5}
+        ))
+        response = self.client.get(f'/api/v1/titles/{titles[0].pk}/reviews/')
+        self.assertEqual(response.status_code, 200)
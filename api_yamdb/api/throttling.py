@@ -0,0 +1,112 @@
+import hashlib
+import time
+from functools import lru_cache
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+THROTTLE_KEY = 'yamdb:throttle:{}:{}'
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+@lru_cache(maxsize=None)
+def parse_rate(rate):
+    """'5/min' -> (5, 60): ёмкость корзины и за сколько секунд она
+    наполняется заново."""
+    capacity, period = rate.split('/')
+    return int(capacity), PERIODS[period[0]]
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Ограничение частоты запросов по алгоритму token bucket.
+
+    Корзина на scope и клиента хранится в кэше парой (токены, время);
+    токены пополняются равномерно, поэтому короткий всплеск до ёмкости
+    проходит, а постоянный поток упирается в заданную частоту. Ставки
+    берутся из DEFAULT_THROTTLE_RATES, пустая ставка выключает scope.
+    Чтение и запись корзины не атомарны: при гонке могут пройти
+    один-два лишних запроса, зато проверка стоит два обращения к кэшу.
+    """
+    scope = None
+
+    def get_ident_key(self, request, view):
+        """Клиент, которому принадлежит корзина; None - не ограничивать.
+
+        По умолчанию - IP-адрес: X-Forwarded-For учитывается только
+        на NUM_PROXIES доверенных прокси, см. настройки.
+        """
+        return self.get_ident(request)
+
+    def allow_request(self, request, view):
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        ident = rate and self.get_ident_key(request, view)
+        if not ident:
+            return True
+        capacity, period = parse_rate(rate)
+        key = THROTTLE_KEY.format(
+            self.scope, hashlib.md5(ident.encode()).hexdigest()
+        )
+        now = time.time()
+        tokens, updated = cache.get(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * capacity / period)
+        if tokens < 1:
+            self.retry_after = (1 - tokens) * period / capacity
+            return False
+        # Через period секунд корзина полна, ключ можно не хранить.
+        cache.set(key, (tokens - 1, now), period)
+        return True
+
+    def wait(self):
+        return self.retry_after
+
+
+class IPThrottle(TokenBucketThrottle):
+    """Корзина на IP-адрес клиента."""
+
+
+class UsernameThrottle(TokenBucketThrottle):
+    """Корзина на пользователя: из запроса входа или текущего."""
+
+    def get_ident_key(self, request, view):
+        if request.user.is_authenticated:
+            return request.user.username
+        data = request.data
+        username = data.get('username') if isinstance(data, dict) else None
+        if isinstance(username, str):
+            return username.lower()
+        return None
+
+
+class SignupIPThrottle(IPThrottle):
+    scope = 'signup_ip'
+
+
+class SignupUsernameThrottle(UsernameThrottle):
+    scope = 'signup_username'
+
+
+class TokenIPThrottle(IPThrottle):
+    scope = 'token_ip'
+
+
+class TokenUsernameThrottle(UsernameThrottle):
+    scope = 'token_username'
+
+
+class WriteIPThrottle(IPThrottle):
+    scope = 'write_ip'
+
+
+class WriteUserThrottle(UsernameThrottle):
+    scope = 'write_user'
+
+
+class CreateThrottleMixin:
+    """Ограничивает только создание объектов во вьюсете."""
+    create_throttle_classes = (WriteIPThrottle, WriteUserThrottle)
+
+    def get_throttles(self):
+        if self.action in ('create', 'batch'):
+            return [throttle() for throttle in self.create_throttle_classes]
+        return super().get_throttles()
@@ -1,9 +1,10 @@
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework.routers import DefaultRouter
 from reviews.views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                           ReviewViewSet, TitleViewSet)
+                           LeaderboardViewSet, ReviewViewSet, TitleViewSet)
 
-from .views import UsersViewSet, create_token, create_user, get_or_patch_user
+from .views import (UsersViewSet, create_token, create_user, db_stats,
+                    export_reviews, export_titles, get_or_patch_user)
 
 router = DefaultRouter()
 
@@ -22,7 +23,16 @@ router.register(
 
 urlpatterns = [
     path('v1/users/me/', get_or_patch_user),
+    path('v1/reviews/batch/', ReviewViewSet.as_view({'post': 'batch'})),
     path('v1/', include(router.urls)),
+    re_path(
+        r'^v1/leaderboards/(?P<board>top|trending)/'
+        r'(?P<scope>category|genre)/(?P<slug>[-\w]+)/$',
+        LeaderboardViewSet.as_view({'get': 'list'})
+    ),
     path('v1/auth/signup/', create_user),
     path('v1/auth/token/', create_token),
+    path('v1/export/titles/', export_titles),
+    path('v1/export/reviews/', export_reviews),
+    path('v1/health/db/', db_stats),
 ]
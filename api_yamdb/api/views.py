@@ -1,18 +1,27 @@
-from django.core.mail import send_mail
+import os
+
+from django.db import transaction
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
 from django.utils.crypto import get_random_string
+from jobs.queue import enqueue
 from rest_framework import filters, permissions, status, viewsets
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (api_view, permission_classes,
+                                       throttle_classes)
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from reviews.models import User
 
-from api_yamdb.settings import EMAIL_FROM
+from api_yamdb.db.health import COUNTERS
+from api_yamdb.db.pool import pool_stats
 
-from .permissions import IsAdmin
+from . import export, metrics
+from .permissions import HasMetricsToken, IsAdmin
 from .serializers import (CreateTokenSerializer, CreateUserInBaseSerializer,
                           CreateUserSerializer)
+from .throttling import (SignupIPThrottle, SignupUsernameThrottle,
+                         TokenIPThrottle, TokenUsernameThrottle)
 
 
 def get_tokens_for_user(user):
@@ -23,17 +32,9 @@ def get_tokens_for_user(user):
     }
 
 
-def send_mail_with_code(confirmation_code, email):
-    send_mail(
-        'Код регистрации',
-        confirmation_code,
-        EMAIL_FROM,
-        [email],
-        fail_silently=False,
-    )
-
-
 @api_view(['POST'])
+@throttle_classes([SignupIPThrottle, SignupUsernameThrottle])
+@transaction.atomic
 def create_user(request):
 
     if request.data.get('username') == 'me':
@@ -45,11 +46,15 @@ def create_user(request):
     code = confirmation_code
     serializer.is_valid(raise_exception=True)
     serializer.save(confirmation_code=code)
-    send_mail_with_code(confirmation_code, email)
+    # Письмо отправит run_workers: ответ не ждёт почтовый сервер.
+    enqueue('send_confirmation_code', {
+        'confirmation_code': confirmation_code, 'email': email
+    })
     return Response(serializer.data)
 
 
 @api_view(['POST'])
+@throttle_classes([TokenIPThrottle, TokenUsernameThrottle])
 def create_token(request):
 
     serializer = CreateTokenSerializer(data=request.data)
@@ -76,20 +81,25 @@ def create_token(request):
 @api_view(['GET', 'PATCH'])
 @permission_classes([permissions.IsAuthenticated])
 def get_or_patch_user(request):
+    user = request.user
+    if user.get_deferred_fields():
+        # Аутентификация из кэша отдаёт только поля для проверки прав,
+        # профиль загружаем целиком одним запросом, а не по полю.
+        user = User.objects.get(pk=user.pk)
 
     if request.method == 'GET':
         # Я так понимаю, что если есть запрос от юзера на /me
         # то этот юзер есть в базе, раз запрос проходит через
         # permissions.IsAuthenticated
 
-        serializer = CreateUserSerializer(request.user)
+        serializer = CreateUserSerializer(user)
         return Response(serializer.data)
 
     if request.method == 'PATCH':
         # См. выше
 
         serializer = CreateUserSerializer(
-            request.user, data=request.data, partial=True
+            user, data=request.data, partial=True
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
@@ -104,3 +114,59 @@ class UsersViewSet(viewsets.ModelViewSet):
     pagination_class = LimitOffsetPagination
     filter_backends = (filters.SearchFilter,)
     search_fields = ('username',)
+
+
+def export_output(request):
+    output = request.query_params.get('output', 'ndjson')
+    if output not in export.CONTENT_TYPES:
+        return None
+    return output
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, IsAdmin])
+def export_titles(request):
+    """Выгрузка всех произведений одним потоком; ?reviews=true с отзывами."""
+    output = export_output(request)
+    with_reviews = request.query_params.get('reviews') in ('1', 'true')
+    if output is None or (with_reviews and output == 'csv'):
+        return Response(
+            'output: ndjson или csv; отзывы выгружаются только в ndjson',
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return export.export_titles(output, with_reviews)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, IsAdmin])
+def export_reviews(request):
+    """Выгрузка всех отзывов одним потоком."""
+    output = export_output(request)
+    if output is None:
+        return Response(
+            'output: ndjson или csv', status=status.HTTP_400_BAD_REQUEST
+        )
+    return export.export_reviews(output)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated, IsAdmin])
+def db_stats(request):
+    """Счётчики проверок соединений и пулов обслужившего процесса."""
+    return Response({
+        'pid': os.getpid(),
+        'health': dict(COUNTERS),
+        'pools': pool_stats(),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([
+    HasMetricsToken | (permissions.IsAuthenticated & IsAdmin)
+])
+def metrics_view(request):
+    """Метрики всех процессов в текстовом формате Prometheus."""
+    return HttpResponse(
+        metrics.render(metrics.collect()),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
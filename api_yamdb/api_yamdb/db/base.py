@@ -0,0 +1,41 @@
+from django.db.backends.postgresql import base, creation
+
+from .pool import close_pools, get_pool
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Свободные соединения пула не дали бы удалить тестовую базу.
+        close_pools(test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL с пулом соединений на процесс: ENGINE = 'api_yamdb.db'.
+
+    Соединение берётся из пула при первом запросе к БД и возвращается
+    туда вместо закрытия, то есть по истечении CONN_MAX_AGE или сразу
+    после запроса при CONN_MAX_AGE = 0. Размер и ожидание задают
+    POOL_SIZE и POOL_TIMEOUT в настройках базы.
+    """
+    creation_class = DatabaseCreation
+    pool = None
+
+    def get_new_connection(self, conn_params):
+        self.pool = get_pool(
+            tuple(sorted(conn_params.items())),
+            lambda: super(DatabaseWrapper, self).get_new_connection(
+                conn_params),
+            self.settings_dict.get('POOL_SIZE', 10),
+            self.settings_dict.get('POOL_TIMEOUT', 5),
+        )
+        connection = self.pool.checkout()
+        # Уровень изоляции выставляется при создании соединения psycopg2.
+        self.isolation_level = connection.isolation_level
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                self.pool.checkin(self.connection)
@@ -0,0 +1,24 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import connections
+
+COUNTERS = Counter()
+
+
+def check_connections(**kwargs):
+    """Перед запросом проверяет соединения, оставшиеся с прошлых.
+
+    Постоянное соединение (CONN_MAX_AGE) могло оборваться, пока процесс
+    простаивал: перезапуск Postgres, таймаут на балансировщике. Тогда
+    оно закрывается, и запрос откроет новое вместо ошибки 500.
+    """
+    if not settings.DB_CONN_HEALTH_CHECKS:
+        return
+    for connection in connections.all():
+        if connection.connection is None or connection.in_atomic_block:
+            continue
+        COUNTERS['health_checks'] += 1
+        if not connection.is_usable():
+            COUNTERS['reconnects'] += 1
+            connection.close()
@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import Counter
+
+import psycopg2
+from django.db import OperationalError
+from psycopg2 import extensions
+
+# Соединение, простоявшее в пуле дольше, перед выдачей проверяется SELECT 1
+CHECK_IDLE_AFTER = 10
+
+POOLS = {}
+POOLS_LOCK = threading.Lock()
+
+
+class ConnectionPool:
+    """Пул соединений psycopg2 одного процесса для одних параметров.
+
+    Держит не больше max_size соединений; когда все выданы, checkout
+    ждёт возврата до timeout секунд. Свободные соединения выдаются
+    с конца списка: горячие переиспользуются, лишние простаивают.
+    Счётчики в counters: checkouts, waits, timeouts, connects и
+    reconnects (сломанное соединение заменено новым).
+    """
+
+    def __init__(self, connect, max_size, timeout):
+        self.connect = connect
+        self.max_size = max_size
+        self.timeout = timeout
+        self.idle = []
+        self.size = 0
+        self.counters = Counter()
+        self.condition = threading.Condition()
+
+    def checkout(self):
+        with self.condition:
+            connection = self.reserve()
+        if connection is not None:
+            connection, returned = connection
+            if self.usable(connection, returned):
+                return connection
+            self.counters['reconnects'] += 1
+            connection.close()
+        try:
+            connection = self.connect()
+        except Exception:
+            self.release()
+            raise
+        self.counters['connects'] += 1
+        return connection
+
+    def reserve(self):
+        """Берёт свободное соединение или место под новое."""
+        self.counters['checkouts'] += 1
+        deadline = time.monotonic() + self.timeout
+        if not self.idle and self.size >= self.max_size:
+            self.counters['waits'] += 1
+        while not self.idle and self.size >= self.max_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.counters['timeouts'] += 1
+                raise OperationalError(
+                    f'Пул соединений исчерпан: {self.max_size} заняты '
+                    f'дольше {self.timeout} с'
+                )
+            self.condition.wait(remaining)
+        if self.idle:
+            return self.idle.pop()
+        self.size += 1
+        return None
+
+    def usable(self, connection, returned):
+        if connection.closed or (
+            connection.get_transaction_status()
+            != extensions.TRANSACTION_STATUS_IDLE
+        ):
+            return False
+        if time.monotonic() - returned < CHECK_IDLE_AFTER:
+            return True
+        try:
+            connection.cursor().execute('SELECT 1')
+        except psycopg2.Error:
+            return False
+        return True
+
+    def checkin(self, connection):
+        """Возвращает соединение; незавершённая транзакция откатывается."""
+        if not connection.closed and (
+            connection.get_transaction_status()
+            != extensions.TRANSACTION_STATUS_IDLE
+        ):
+            try:
+                connection.rollback()
+            except psycopg2.Error:
+                connection.close()
+        if connection.closed:
+            self.release()
+            return
+        with self.condition:
+            self.idle.append((connection, time.monotonic()))
+            self.condition.notify()
+
+    def release(self):
+        with self.condition:
+            self.size -= 1
+            self.condition.notify()
+
+    def close_idle(self):
+        with self.condition:
+            idle, self.idle = self.idle, []
+            self.size -= len(idle)
+            self.condition.notify_all()
+        for connection, _ in idle:
+            connection.close()
+
+    def stats(self):
+        with self.condition:
+            return dict(
+                self.counters,
+                size=self.size,
+                idle=len(self.idle),
+                max_size=self.max_size,
+            )
+
+
+def get_pool(key, connect, max_size, timeout):
+    with POOLS_LOCK:
+        if key not in POOLS:
+            POOLS[key] = ConnectionPool(connect, max_size, timeout)
+        return POOLS[key]
+
+
+def pool_stats():
+    """Счётчики пулов этого процесса по именам баз данных."""
+    with POOLS_LOCK:
+        pools = list(POOLS.items())
+    return {dict(key)['database']: pool.stats() for key, pool in pools}
+
+
+def close_pools(database=None):
+    """Закрывает свободные соединения, например перед DROP DATABASE."""
+    with POOLS_LOCK:
+        pools = list(POOLS.items())
+    for key, pool in pools:
+        if database is None or dict(key)['database'] == database:
+            pool.close_idle()
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -24,11 +25,13 @@ INSTALLED_APPS = [
     'rest_framework.authtoken',
     'rest_framework_simplejwt',
     'reviews',
-    'api',
+    'api.apps.ApiConfig',
+    'jobs.apps.JobsConfig',
     'drf_yasg',
 ]
 
 MIDDLEWARE = [
+    'api.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -72,10 +75,41 @@ DATABASES = {
             'POSTGRES_USER', default='postgres'),
         'PASSWORD': os.getenv('POSTGRES_PASSWORD', default='postgres'),
         'HOST': os.getenv('DB_HOST', default='db'),
-        'PORT': os.getenv('DB_PORT', default='5432')
+        'PORT': os.getenv('DB_PORT', default='5432'),
+        # Сколько секунд держать соединение между запросами, 0 - закрывать
+        'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', default=60)),
+        # Пул соединений процесса, только для ENGINE = 'api_yamdb.db'
+        'POOL_SIZE': int(os.getenv('DB_POOL_SIZE', default=10)),
+        'POOL_TIMEOUT': float(os.getenv('DB_POOL_TIMEOUT', default=5)),
     }
 }
 
+# Проверять переиспользуемое соединение перед запросом, см. api_yamdb.db
+DB_CONN_HEALTH_CHECKS = os.getenv(
+    'DB_CONN_HEALTH_CHECKS', default='true').lower() == 'true'
+
+# Cache
+
+# По умолчанию кэш в файлах: версии ресурсов и кэш ответов должны быть
+# общими для процессов веб-сервера и run_workers, см. api.cache.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            default=os.path.join(tempfile.gettempdir(), 'yamdb_cache')),
+    }
+}
+
+# Сколько секунд хранить закэшированные ответы API для анонимов
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', default=300))
+
+# Сколько секунд JWT-аутентификация берёт пользователя из кэша
+AUTH_USER_CACHE_TIMEOUT = int(
+    os.getenv('AUTH_USER_CACHE_TIMEOUT', default=60))
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -99,18 +133,68 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+PAGINATOR_PAGE_ITEMS_COUNT = 10
+
+# Начиная с какого числа строк count в ответе может быть приблизительным
+PAGINATION_COUNT_THRESHOLD = int(
+    os.getenv('PAGINATION_COUNT_THRESHOLD', default=100000))
+PAGINATION_COUNT_CACHE_TIMEOUT = int(
+    os.getenv('PAGINATION_COUNT_CACHE_TIMEOUT', default=60))
+
+# Сколько объектов можно создать одним пакетным запросом
+BATCH_MAX_ITEMS = int(os.getenv('BATCH_MAX_ITEMS', default=1000))
+
+# Рейтинги по категориям и жанрам: вес средней оценки в байесовском
+# балле (в отзывах) и окно trending в днях
+LEADERBOARD_PRIOR_REVIEWS = int(
+    os.getenv('LEADERBOARD_PRIOR_REVIEWS', default=10))
+LEADERBOARD_TRENDING_DAYS = int(
+    os.getenv('LEADERBOARD_TRENDING_DAYS', default=7))
+
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
 
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.PageNumberPagination',
-    'PAGE_SIZE': 10,
+    'PAGE_SIZE': PAGINATOR_PAGE_ITEMS_COUNT,
+
+    # JSON на orjson; MessagePack по Accept/Content-Type application/msgpack
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'api.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.renderers.FastJSONParser',
+        'api.renderers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+
+    # Сколько прокси перед приложением дописывают X-Forwarded-For: IP
+    # клиента для ограничений берётся на столько адресов с конца. 0 -
+    # заголовку не доверять, иначе клиент подставит в него любой адрес.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', default=0)),
+
+    # Ёмкость корзины / за сколько она наполняется, см. api.throttling;
+    # переопределяются переменными THROTTLE_<SCOPE>, пустая выключает.
+    'DEFAULT_THROTTLE_RATES': {
+        scope: os.getenv(f'THROTTLE_{scope.upper()}', default=rate) or None
+        for scope, rate in (
+            ('signup_ip', '10/hour'),
+            ('signup_username', '3/hour'),
+            ('token_ip', '30/min'),
+            ('token_username', '5/min'),
+            ('write_ip', '60/min'),
+            ('write_user', '30/min'),
+        )
+    },
 }
 
 
@@ -137,6 +221,36 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, "sent_emails")
 EMAIL_FROM = 'api_yamdb@mail.com'
 
+# Фоновые задачи: опрос очереди, попытки и задержки между ними, секунд
+JOBS_POLL_INTERVAL = float(os.getenv('JOBS_POLL_INTERVAL', default=1))
+JOBS_MAX_ATTEMPTS = int(os.getenv('JOBS_MAX_ATTEMPTS', default=5))
+JOBS_BACKOFF_BASE = 10
+JOBS_BACKOFF_MAX = 3600
+# Задача дольше этого считается брошенной упавшим обработчиком
+JOBS_LOCK_TIMEOUT = 600
+
+# Метрики Prometheus на /metrics: снимки процессов, раз в сколько секунд
+# их обновлять, через сколько секунд без обновлений удалять, и токен
+# сборщика (иначе доступ только администратору)
+METRICS_DIR = os.getenv(
+    'METRICS_DIR', default=os.path.join(tempfile.gettempdir(), 'yamdb_metrics'))
+METRICS_FLUSH_INTERVAL = float(
+    os.getenv('METRICS_FLUSH_INTERVAL', default=5))
+METRICS_SNAPSHOT_MAX_AGE = float(
+    os.getenv('METRICS_SNAPSHOT_MAX_AGE', default=86400))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', default='')
+
+# Журнал медленных запросов (0 - выключен): порог в мс, файл, доля
+# запросов с EXPLAIN и предел планов в минуту на процесс
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', default=0))
+SLOW_QUERY_LOG = os.getenv(
+    'SLOW_QUERY_LOG',
+    default=os.path.join(tempfile.gettempdir(), 'yamdb_slow_queries.log'))
+SLOW_QUERY_EXPLAIN_SAMPLE = float(
+    os.getenv('SLOW_QUERY_EXPLAIN_SAMPLE', default=0.2))
+SLOW_QUERY_EXPLAINS_PER_MINUTE = int(
+    os.getenv('SLOW_QUERY_EXPLAINS_PER_MINUTE', default=10))
+
 SWAGGER_SETTINGS = {
     'SECURITY_DEFINITIONS': {
         'Bearer': {
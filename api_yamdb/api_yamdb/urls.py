@@ -1,3 +1,4 @@
+from api.views import metrics_view
 from django.conf.urls import url
 from django.contrib import admin
 from django.urls import include, path
@@ -11,6 +12,7 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('admin/', admin.site.urls),
     path('api/', include('api.urls')),
+    path('metrics', metrics_view),
 ]
 
 schema_view = get_schema_view(
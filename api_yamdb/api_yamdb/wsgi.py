@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
 
 application = get_wsgi_application()
+
+from api.cache import check_shared_cache  # noqa: E402
+from api.metrics import start_serving  # noqa: E402
+
+check_shared_cache()
+start_serving()
@@ -0,0 +1,25 @@
+from django.contrib import admin
+from django.utils import timezone
+
+from .models import Job
+
+
+class JobAdmin(admin.ModelAdmin):
+    """Страница фоновых задач в админке."""
+    list_display = ('pk', 'name', 'status', 'attempts', 'run_at', 'created')
+    list_display_links = ('pk', 'name',)
+    list_filter = ('status', 'name')
+    readonly_fields = ('locked_by', 'locked_at', 'last_error', 'created',
+                       'finished')
+    actions = ('retry',)
+
+    def retry(self, request, queryset):
+        """Возвращает задачи в очередь с новым запасом попыток."""
+        queryset.exclude(status=Job.RUNNING).update(
+            status=Job.PENDING, attempts=0, run_at=timezone.now(),
+            finished=None
+        )
+    retry.short_description = 'Повторить выбранные задачи'
+
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,81 @@
+import multiprocessing
+import os
+import signal
+import socket
+import time
+
+from api.cache import check_shared_cache
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from jobs.queue import claim, release_stale, run_job
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes', type=int, default=1,
+            help='Сколько процессов-обработчиков запустить.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=10,
+            help='Сколько задач забирать за одно обращение к очереди.'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и завершиться.'
+        )
+
+    def handle(self, *args, **options):
+        # Задачи сдвигают версии ресурсов, которые читает веб-сервер.
+        check_shared_cache()
+        self.stopping = False
+        self.parent_pid = os.getpid()
+        self.processes = []
+        if options['once']:
+            self.work(options)
+            return
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        if options['processes'] <= 1:
+            self.work(options)
+            return
+        # Соединения с БД не должны достаться дочерним процессам.
+        connections.close_all()
+        self.processes = [
+            multiprocessing.Process(target=self.work, args=(options,))
+            for _ in range(options['processes'])
+        ]
+        for process in self.processes:
+            process.start()
+        for process in self.processes:
+            process.join()
+
+    def stop(self, signum, frame):
+        # Текущая задача дорабатывается, новые не берутся.
+        self.stopping = True
+        if os.getpid() == self.parent_pid:
+            for process in self.processes:
+                process.terminate()
+
+    def work(self, options):
+        worker = f'{socket.gethostname()}:{os.getpid()}'
+        done = failed = 0
+        while not self.stopping:
+            close_old_connections()
+            release_stale()
+            jobs = claim(worker, options['batch_size'])
+            for job in jobs:
+                if run_job(job):
+                    done += 1
+                else:
+                    failed += 1
+            if not jobs:
+                if options['once']:
+                    break
+                time.sleep(settings.JOBS_POLL_INTERVAL)
+        self.stdout.write(
+            f'{worker}: выполнено {done}, с ошибкой {failed}'
+        )
@@ -0,0 +1,41 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    DEAD = 'dead'
+    STATUS_CHOICES = [
+        (PENDING, 'ожидает'),
+        (RUNNING, 'выполняется'),
+        (DONE, 'выполнена'),
+        (DEAD, 'не выполнена'),
+    ]
+    name = models.CharField('Тип задачи', max_length=100)
+    payload = models.TextField('Параметры, JSON', default='{}')
+    status = models.CharField(
+        'Статус', max_length=10, choices=STATUS_CHOICES, default=PENDING
+    )
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField('Предел попыток')
+    run_at = models.DateTimeField('Выполнить после', default=timezone.now)
+    locked_by = models.CharField('Обработчик', max_length=100, blank=True)
+    locked_at = models.DateTimeField('Взята в работу', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    finished = models.DateTimeField('Дата завершения', null=True, blank=True)
+
+    class Meta:
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+        indexes = (
+            models.Index(
+                fields=('status', 'run_at'), name='job_status_run_at_idx'
+            ),
+        )
+        ordering = ('id',)
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
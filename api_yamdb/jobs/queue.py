@@ -0,0 +1,109 @@
+"""Очередь фоновых задач в таблице БД.
+
+Задача ставится через enqueue в той же транзакции, что и данные,
+из-за которых она появилась, и выполняется процессом run_workers.
+Ошибка откладывает повтор с экспоненциальной задержкой, после
+max_attempts попыток задача остаётся в статусе dead для разбора.
+"""
+import json
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+
+
+def handler(name):
+    """Регистрирует функцию обработчиком задач типа name."""
+    def register(func):
+        HANDLERS[name] = func
+        return func
+    return register
+
+
+def enqueue(name, payload=None, delay=0, max_attempts=None):
+    """Ставит задачу в очередь; payload должен сериализоваться в JSON."""
+    if name not in HANDLERS:
+        raise ValueError(f'Нет обработчика задач {name!r}')
+    return Job.objects.create(
+        name=name,
+        payload=json.dumps(payload or {}),
+        run_at=timezone.now() + timedelta(seconds=delay),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+
+
+def backoff(attempts):
+    """Задержка перед следующей попыткой: 2^n с разбросом до четверти."""
+    delay = min(
+        settings.JOBS_BACKOFF_BASE * 2 ** (attempts - 1),
+        settings.JOBS_BACKOFF_MAX
+    )
+    return timedelta(seconds=delay * random.uniform(1, 1.25))
+
+
+def release_stale():
+    """Возвращает в очередь задачи упавших обработчиков."""
+    return Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=timezone.now() - timedelta(
+            seconds=settings.JOBS_LOCK_TIMEOUT
+        ),
+    ).update(status=Job.PENDING, locked_by='', locked_at=None)
+
+
+def claim(worker, limit):
+    """Забирает до limit готовых задач, не мешая другим обработчикам.
+
+    На PostgreSQL строки, заблокированные соседями, пропускаются
+    (SKIP LOCKED); условный UPDATE по статусу страхует остальные БД.
+    """
+    now = timezone.now()
+    claimed = []
+    with transaction.atomic():
+        ids = Job.objects.select_for_update(skip_locked=True).filter(
+            status=Job.PENDING, run_at__lte=now
+        ).order_by('run_at', 'id').values_list('id', flat=True)[:limit]
+        for job_id in ids:
+            if Job.objects.filter(pk=job_id, status=Job.PENDING).update(
+                status=Job.RUNNING, locked_by=worker, locked_at=now
+            ):
+                claimed.append(job_id)
+    return list(Job.objects.filter(pk__in=claimed))
+
+
+def run_job(job):
+    """Выполняет задачу и записывает результат; True при успехе."""
+    job.attempts += 1
+    try:
+        HANDLERS[job.name](json.loads(job.payload))
+    except Exception:
+        job.last_error = traceback.format_exc()
+        if job.attempts >= job.max_attempts or job.name not in HANDLERS:
+            job.status = Job.DEAD
+            job.finished = timezone.now()
+            logger.error('Задача %s не выполнена:\n%s', job, job.last_error)
+        else:
+            job.status = Job.PENDING
+            job.run_at = timezone.now() + backoff(job.attempts)
+        succeeded = False
+    else:
+        job.status = Job.DONE
+        job.finished = timezone.now()
+        succeeded = True
+    job.locked_by = ''
+    job.locked_at = None
+    job.save(update_fields=(
+        'attempts', 'status', 'run_at', 'last_error', 'finished',
+        'locked_by', 'locked_at',
+    ))
+    return succeeded
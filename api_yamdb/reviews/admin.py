@@ -29,6 +29,7 @@ class TitleAdmin(admin.ModelAdmin):
     list_display_links = ('pk', 'name',)
     list_filter = ('name',)
     search_fields = ('name',)
+    readonly_fields = ('rating', 'score_sum', 'reviews_count')
     empty_value_display = '-пусто-'
 
 
@@ -0,0 +1,20 @@
+"""Общие помощники команд замеров и генерации данных."""
+
+SYLLABLES = (
+    'ка', 'ми', 'ро', 'ла', 'но', 'те', 'ва', 'си', 'до', 'ре', 'па', 'лу',
+    'зо', 'би', 'ган', 'тор', 'вель', 'мир', 'сон', 'ар', 'ен', 'ус', 'ол',
+)
+
+
+def make_vocabulary(rng, size):
+    """size разных псевдослов из слогов, по алфавиту."""
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choices(SYLLABLES, k=rng.randint(2, 4))))
+    return sorted(words)
+
+
+def percentile(values, share):
+    """Значение, ниже которого доля share выборки values."""
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * share))]
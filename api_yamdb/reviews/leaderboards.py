@@ -0,0 +1,131 @@
+"""Рейтинги произведений по категориям и жанрам.
+
+top упорядочивает по байесовской оценке: к отзывам произведения
+добавляется LEADERBOARD_PRIOR_REVIEWS воображаемых отзывов со средней
+оценкой по всем произведениям, так что пара десяток не обгонит сотню
+девяток. trending - число отзывов за LEADERBOARD_TRENDING_DAYS дней.
+
+Запись отзыва ставит в той же транзакции фоновую задачу пересчитать
+строки его произведения (schedule_refresh), а rebuild_leaderboards
+периодически пересчитывает всё: обновляет среднюю оценку и убирает
+отзывы, выпавшие из окна trending.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+from jobs.queue import enqueue
+
+from .bulk import write_rows
+from .models import Leaderboard, LeaderboardMean, Review, Title
+
+COLUMNS = ('board', 'scope', 'scope_id', 'title_id', 'score')
+
+
+def global_mean():
+    """Средняя оценка по всем отзывам."""
+    totals = Title.objects.aggregate(
+        score_sum=Sum('score_sum'), count=Sum('reviews_count')
+    )
+    if not totals['count']:
+        return 0
+    return totals['score_sum'] / totals['count']
+
+
+def prior_mean():
+    """Средняя оценка последней полной пересборки.
+
+    Между пересборками она не меняется, чтобы баллы, пересчитанные
+    после отзыва, были сравнимы с остальными. До первой пересборки
+    сохраняется текущая средняя.
+    """
+    mean = LeaderboardMean.objects.filter(
+        pk=LeaderboardMean.SINGLETON_ID
+    ).values_list('mean', flat=True).first()
+    if mean is not None:
+        return mean
+    return LeaderboardMean.objects.get_or_create(
+        pk=LeaderboardMean.SINGLETON_ID, defaults={'mean': global_mean()}
+    )[0].mean
+
+
+def save_mean(mean):
+    LeaderboardMean.objects.update_or_create(
+        pk=LeaderboardMean.SINGLETON_ID, defaults={'mean': mean}
+    )
+
+
+def bayesian(score_sum, count, mean):
+    prior = settings.LEADERBOARD_PRIOR_REVIEWS
+    return (prior * mean + score_sum) / (prior + count)
+
+
+def refresh_leaderboards(title_ids, mean=None):
+    """Пересчитывает строки рейтингов произведений title_ids."""
+    title_ids = list(title_ids)
+    if mean is None:
+        mean = prior_mean()
+    genres = defaultdict(list)
+    for title_id, genre_id in Title.genre.through.objects.filter(
+            title_id__in=title_ids).values_list('title_id', 'genre_id'):
+        genres[title_id].append(genre_id)
+    recent = dict(Review.objects.filter(
+        title_id__in=title_ids,
+        pub_date__gte=timezone.now() - timedelta(
+            days=settings.LEADERBOARD_TRENDING_DAYS),
+    ).order_by().values('title_id').annotate(
+        count=Count('id')
+    ).values_list('title_id', 'count'))
+    rows = []
+    for pk, category_id, score_sum, count in Title.objects.filter(
+            pk__in=title_ids).values_list(
+            'pk', 'category_id', 'score_sum', 'reviews_count'):
+        scopes = [(Leaderboard.GENRE, genre_id) for genre_id in genres[pk]]
+        if category_id is not None:
+            scopes.append((Leaderboard.CATEGORY, category_id))
+        scores = []
+        if count:
+            scores.append((Leaderboard.TOP, bayesian(score_sum, count, mean)))
+        if recent.get(pk):
+            scores.append((Leaderboard.TRENDING, recent[pk]))
+        rows.extend(
+            (board, scope, scope_id, pk, score)
+            for board, score in scores
+            for scope, scope_id in scopes
+        )
+    Leaderboard.objects.filter(title_id__in=title_ids).delete()
+    write_rows(Leaderboard, COLUMNS, rows, 1000)
+    return len(rows)
+
+
+def schedule_refresh(title_ids):
+    """Ставит пересчёт рейтингов произведений в очередь задач."""
+    enqueue('refresh_leaderboards', {'title_ids': sorted(title_ids)})
+
+
+def forget_scope(scope, scope_id):
+    """Убирает рейтинг удалённой категории или жанра."""
+    Leaderboard.objects.filter(scope=scope, scope_id=scope_id).delete()
+
+
+def rebuild_leaderboards(chunk_size=1000):
+    """Пересчитывает все рейтинги пачками по chunk_size произведений.
+
+    Каждая пачка - своя транзакция: чтения не ждут конца пересборки.
+    Возвращает число строк в рейтингах.
+    """
+    mean = global_mean()
+    save_mean(mean)
+    rows = 0
+    last_pk = 0
+    while True:
+        title_ids = list(Title.objects.filter(pk__gt=last_pk).order_by(
+            'pk').values_list('pk', flat=True)[:chunk_size])
+        if not title_ids:
+            return rows
+        last_pk = title_ids[-1]
+        with transaction.atomic():
+            rows += refresh_leaderboards(title_ids, mean)
@@ -0,0 +1,106 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import setup_test_environment, teardown_test_environment
+from reviews.benchmarking import make_vocabulary, percentile
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = ('Замеряет поиск по произведениям против icontains. '
+            'Синтетические произведения создаются в отдельной тестовой '
+            'базе, как у manage.py test; с --keepdb она остаётся, и '
+            'следующий запуск только досоздаёт недостающие до --titles.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000000)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--keepdb', action='store_true',
+            help='Не удалять тестовую базу после замера.'
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False,
+            keepdb=options['keepdb']
+        )
+        try:
+            self.run(options)
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options['keepdb']
+            )
+            teardown_test_environment()
+
+    def run(self, options):
+        rng = random.Random(options['seed'])
+        vocabulary = make_vocabulary(rng, 20000)
+        self.seed_titles(rng, vocabulary, options)
+        terms = rng.sample(vocabulary, options['repeat'])
+        cases = {
+            'слово': [(term, term) for term in terms],
+            'префикс': [(term[:4], term[:4]) for term in terms],
+            'два слова': [
+                (f'{first} {second}', first)
+                for first, second in zip(terms, reversed(terms))
+            ],
+        }
+        self.stdout.write(
+            f'{"запрос":<10} {"способ":<10} {"p50, мс":>9} {"p95, мс":>9}'
+        )
+        for case, queries in cases.items():
+            self.report(case, 'search', [
+                lambda text=text: Title.objects.search(text)
+                for text, _ in queries
+            ])
+            self.report(case, 'icontains', [
+                lambda name=name: Title.objects.filter(name__icontains=name)
+                for _, name in queries
+            ])
+
+    def seed_titles(self, rng, vocabulary, options):
+        missing = options['titles'] - Title.objects.count()
+        started = time.monotonic()
+        while missing > 0:
+            size = min(missing, options['batch_size'])
+            with transaction.atomic():
+                Title.objects.bulk_create(
+                    Title(
+                        name=' '.join(rng.choices(
+                            vocabulary, k=rng.randint(1, 4)
+                        )).capitalize(),
+                        description=' '.join(rng.choices(vocabulary, k=12)),
+                        year=rng.randint(1900, 2021),
+                    )
+                    for _ in range(size)
+                )
+            missing -= size
+            self.stdout.write(
+                f'Создано произведений: {Title.objects.count()}', ending='\r'
+            )
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE reviews_title')
+        self.stdout.write(
+            f'\nПроизведений: {Title.objects.count()}, '
+            f'подготовка {time.monotonic() - started:.1f} с'
+        )
+
+    def report(self, case, method, querysets):
+        timings = []
+        for make_queryset in querysets:
+            started = time.perf_counter()
+            list(make_queryset()[:10])
+            timings.append((time.perf_counter() - started) * 1000)
+        self.stdout.write(
+            f'{case:<10} {method:<10} '
+            f'{statistics.median(timings):>9.2f} '
+            f'{percentile(timings, 0.95):>9.2f}'
+        )
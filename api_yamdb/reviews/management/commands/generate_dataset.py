@@ -0,0 +1,275 @@
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+from api.cache import bump_version
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+from reviews.benchmarking import make_vocabulary
+from reviews.bulk import batched, keep_dates, reset_sequences, write_rows
+from reviews.leaderboards import rebuild_leaderboards
+from reviews.models import Category, Comment, Genre, Review, Title, User
+
+GenreLink = Title.genre.through
+# Даты отзывов и комментариев - за DAYS дней до UNTIL: от текущего
+# времени они отличались бы от запуска к запуску.
+UNTIL = datetime(2026, 1, 1, tzinfo=timezone.utc)
+DAYS = 5 * 365
+
+
+def zipf_share(rank, count, skew):
+    """Доля первых rank из count рангов при частоте ~ 1 / ранг ** skew.
+
+    Непрерывное приближение закона Ципфа: считается за O(1), поэтому
+    годится и для миллионов рангов.
+    """
+    if skew == 1:
+        return math.log(rank + 1) / math.log(count + 1)
+    power = 1 - skew
+    return ((rank + 1) ** power - 1) / ((count + 1) ** power - 1)
+
+
+def zipf_rank(rng, count, skew):
+    """Случайный ранг 0..count-1, первые ранги выпадают чаще."""
+    share = rng.random()
+    if skew == 1:
+        rank = (count + 1) ** share
+    else:
+        power = 1 - skew
+        rank = (1 + share * ((count + 1) ** power - 1)) ** (1 / power)
+    return min(int(rank) - 1, count - 1)
+
+
+def next_id(model):
+    return (model.objects.aggregate(top=Max('pk'))['top'] or 0) + 1
+
+
+class Command(BaseCommand):
+    help = ('Создаёт синтетический каталог заданного объёма с перекосом: '
+            'немногие произведения собирают большинство отзывов, немногие '
+            'пользователи пишут большинство комментариев. Одинаковый '
+            '--seed даёт одинаковые данные.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--genres', type=int, default=50)
+        parser.add_argument('--titles', type=int, default=100000)
+        parser.add_argument('--reviews', type=int, default=1000000)
+        parser.add_argument('--comments', type=int, default=1000000)
+        parser.add_argument(
+            '--title-skew', type=float, default=1.0,
+            help='Показатель Ципфа для отзывов по произведениям и '
+                 'комментариев по ним же, 0 - равномерно.'
+        )
+        parser.add_argument(
+            '--user-skew', type=float, default=1.0,
+            help='Показатель Ципфа для авторов комментариев.'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--batch-size', type=int, default=2000,
+            help='Строк в одном INSERT, если нет COPY.'
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=50000,
+            help='Строк в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['titles']) < 1 or min(
+                options['categories'], options['genres']) < 1:
+            raise CommandError(
+                'Нужен хотя бы один пользователь, категория, жанр и '
+                'произведение.'
+            )
+        self.options = options
+        self.rng = random.Random(options['seed'])
+        self.vocabulary = make_vocabulary(self.rng, 20000)
+        # Тексты отзывов и комментариев берутся из готового набора:
+        # собирать каждый из слов дольше, чем вставить строку.
+        self.texts = [self.words(self.rng, 3, 40) for _ in range(10000)]
+        self.start = {
+            model: next_id(model)
+            for model in (User, Category, Genre, Title, Review, Comment)
+        }
+        self.plan_reviews()
+        with keep_dates(Review, 'pub_date'), keep_dates(Comment, 'pub_date'):
+            for name, model, fields, rows in (
+                ('users', User, ('id', 'username', 'email', 'password',
+                                 'date_joined'), self.users()),
+                ('categories', Category, ('id', 'name', 'slug'),
+                 self.categories()),
+                ('genres', Genre, ('id', 'name', 'slug'), self.genres()),
+                ('titles', Title, ('id', 'name', 'year', 'description',
+                                   'category_id', 'score_sum',
+                                   'reviews_count', 'rating'),
+                 self.titles()),
+                ('genre links', GenreLink, ('title_id', 'genre_id'),
+                 self.genre_links()),
+                ('reviews', Review, ('id', 'title_id', 'author_id', 'text',
+                                     'score', 'pub_date'), self.reviews()),
+                ('comments', Comment, ('id', 'reviews_id', 'author_id',
+                                       'text', 'pub_date'), self.comments()),
+            ):
+                self.load(name, model, fields, rows)
+        reset_sequences(User, Category, Genre, Title, GenreLink, Review,
+                        Comment)
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                for model in (User, Title, GenreLink, Review, Comment):
+                    cursor.execute(f'ANALYZE {model._meta.db_table}')
+        # Загрузка идёт мимо schedule_refresh: рейтинги строятся заново.
+        rows = rebuild_leaderboards()
+        bump_version('titles', 'categories', 'genres')
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово, строк в рейтингах: {rows}.'
+        ))
+
+    def load(self, name, model, fields, rows):
+        started = time.monotonic()
+        loaded = 0
+        for chunk in batched(rows, self.options['chunk_size']):
+            with transaction.atomic():
+                write_rows(model, fields, chunk, self.options['batch_size'])
+            loaded += len(chunk)
+            self.progress(name, loaded, started, ending='\r')
+        self.progress(name, loaded, started)
+
+    def progress(self, name, loaded, started, ending='\n'):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self.stdout.write(
+            f'{name}: {loaded} строк за {elapsed:.1f} с, '
+            f'{loaded / elapsed:.0f} строк/с', ending=ending
+        )
+        self.stdout.flush()
+
+    def plan_reviews(self):
+        """Сколько отзывов у каждого произведения.
+
+        Произведению со случайным рангом достаётся доля отзывов по закону
+        Ципфа; у одного произведения не больше отзывов, чем пользователей,
+        ведь автор пишет на произведение один отзыв. Отзывы произведения
+        получают идущие подряд id, начиная с offsets.
+        """
+        count = self.options['titles']
+        total = self.options['reviews']
+        skew = self.options['title_skew']
+        self.ranks = list(range(count))
+        self.rng.shuffle(self.ranks)
+        self.by_rank = [0] * count
+        for index, rank in enumerate(self.ranks):
+            self.by_rank[rank] = index
+        self.review_counts = []
+        self.offsets = []
+        offset = self.start[Review]
+        for rank in self.ranks:
+            reviews = round(total * zipf_share(rank + 1, count, skew)) - round(
+                total * zipf_share(rank, count, skew))
+            reviews = min(reviews, self.options['users'])
+            self.review_counts.append(reviews)
+            self.offsets.append(offset)
+            offset += reviews
+        if offset - self.start[Review] < total:
+            self.stdout.write(
+                f'Отзывов будет {offset - self.start[Review]} из {total}: '
+                f'у произведения не больше {self.options["users"]} отзывов, '
+                'увеличьте --users или уменьшите --title-skew.'
+            )
+
+    def words(self, rng, low, high):
+        return ' '.join(rng.choices(self.vocabulary, k=rng.randint(low, high)))
+
+    def date(self, rng):
+        return UNTIL - timedelta(seconds=rng.randrange(DAYS * 86400))
+
+    def users(self):
+        password = make_password(None)
+        for pk in range(self.start[User],
+                        self.start[User] + self.options['users']):
+            yield (pk, f'user{pk}', f'user{pk}@example.com', password,
+                   self.date(self.rng))
+
+    def categories(self):
+        for pk in range(self.start[Category],
+                        self.start[Category] + self.options['categories']):
+            yield pk, f'Категория {pk}', f'category-{pk}'
+
+    def genres(self):
+        for pk in range(self.start[Genre],
+                        self.start[Genre] + self.options['genres']):
+            yield pk, f'Жанр {pk}', f'genre-{pk}'
+
+    def title_rng(self, index):
+        # Оценки одного произведения воспроизводятся дважды: для его
+        # рейтинга и для самих отзывов, поэтому у него свой генератор.
+        return random.Random(f'{self.options["seed"]}:{index}')
+
+    def titles(self):
+        categories = self.options['categories']
+        for index, reviews in enumerate(self.review_counts):
+            rng = self.title_rng(index)
+            score_sum = sum(rng.randint(1, 10) for _ in range(reviews))
+            yield (
+                self.start[Title] + index,
+                self.words(self.rng, 1, 4).capitalize(),
+                self.rng.randint(1900, 2021),
+                self.words(self.rng, 8, 30),
+                self.start[Category] + self.rng.randrange(categories),
+                score_sum,
+                reviews,
+                score_sum / reviews if reviews else None,
+            )
+
+    def genre_links(self):
+        genres = range(self.start[Genre],
+                       self.start[Genre] + self.options['genres'])
+        for index in range(self.options['titles']):
+            k = min(len(genres), self.rng.randint(1, 3))
+            for genre_id in self.rng.sample(genres, k):
+                yield self.start[Title] + index, genre_id
+
+    def reviews(self):
+        users = self.options['users']
+        for index, reviews in enumerate(self.review_counts):
+            rng = self.title_rng(index)
+            scores = [rng.randint(1, 10) for _ in range(reviews)]
+            authors = rng.sample(range(users), reviews)
+            for number, (score, author) in enumerate(zip(scores, authors)):
+                yield (
+                    self.offsets[index] + number,
+                    self.start[Title] + index,
+                    self.start[User] + author,
+                    rng.choice(self.texts),
+                    score,
+                    self.date(rng),
+                )
+
+    def comments(self):
+        """Комментарии к отзывам популярных произведений, авторы - по Ципфу."""
+        if not any(self.review_counts):
+            return
+        titles = self.options['titles']
+        for pk in range(self.start[Comment],
+                        self.start[Comment] + self.options['comments']):
+            index = self.by_rank[zipf_rank(
+                self.rng, titles, self.options['title_skew']
+            )]
+            while not self.review_counts[index]:
+                index = self.by_rank[zipf_rank(
+                    self.rng, titles, self.options['title_skew']
+                )]
+            yield (
+                pk,
+                self.offsets[index] + self.rng.randrange(
+                    self.review_counts[index]),
+                self.start[User] + zipf_rank(
+                    self.rng, self.options['users'], self.options['user_skew']
+                ),
+                self.rng.choice(self.texts),
+                self.date(self.rng),
+            )
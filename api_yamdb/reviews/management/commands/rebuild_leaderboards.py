@@ -0,0 +1,20 @@
+from api.cache import bump_version
+from django.core.management.base import BaseCommand
+from reviews.leaderboards import rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает рейтинги произведений по категориям и жанрам. '
+            'Запускайте по расписанию, например раз в час, и после '
+            'массовой загрузки отзывов.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Сколько произведений пересчитывать в одной транзакции.'
+        )
+
+    def handle(self, *args, **options):
+        rows = rebuild_leaderboards(options['chunk_size'])
+        bump_version('titles')
+        self.stdout.write(self.style.SUCCESS(f'Строк в рейтингах: {rows}'))
@@ -0,0 +1,21 @@
+from api.cache import bump_version
+from django.core.management.base import BaseCommand
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает сохранённый рейтинг произведений по отзывам.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Сколько произведений обновлять за один запрос.'
+        )
+
+    def handle(self, *args, **options):
+        fixed = Title.objects.rebuild_ratings(options['chunk_size'])
+        if fixed:
+            bump_version('titles')
+        self.stdout.write(self.style.SUCCESS(
+            f'Рейтинг исправлен у {fixed} произведений'
+        ))
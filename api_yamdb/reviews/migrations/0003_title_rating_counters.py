@@ -0,0 +1,45 @@
+# Generated by Django 2.2.16 on 2026-10-18 19:20
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import reviews.validators
+
+
+def fill_rating_counters(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    totals = Review.objects.order_by().values('title_id').annotate(
+        total=Sum('score'), count=Count('id')
+    )
+    for row in totals.iterator():
+        Title.objects.filter(pk=row['title_id']).update(
+            score_sum=row['total'],
+            reviews_count=row['count'],
+            rating=row['total'] / row['count'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0002_auto_20211123_1556'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='reviews_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, verbose_name='Сумма оценок'),
+        ),
+        migrations.AlterField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(default=None, null=True, validators=[reviews.validators.score_validation], verbose_name='Оценка'),
+        ),
+        migrations.RunPython(fill_rating_counters, migrations.RunPython.noop),
+    ]
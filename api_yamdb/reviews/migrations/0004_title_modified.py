@@ -0,0 +1,20 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:05
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_title_rating_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='modified',
+            field=models.DateTimeField(auto_now=True, db_index=True, default=django.utils.timezone.now, verbose_name='Дата изменения'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,128 @@
+# Generated by Django 2.2.16 on 2026-10-18 21:10
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+POSTGRESQL_FORWARD = (
+    '''
+    CREATE FUNCTION reviews_title_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('simple', coalesce(NEW.name, '')), 'A')
+            || setweight(
+                to_tsvector('simple', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    '''
+    CREATE TRIGGER reviews_title_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description ON reviews_title
+    FOR EACH ROW EXECUTE PROCEDURE reviews_title_search_vector_update()
+    ''',
+    'UPDATE reviews_title SET name = name',
+    'CREATE INDEX title_search_vector_idx ON reviews_title '
+    'USING gin (search_vector)',
+)
+POSTGRESQL_BACKWARD = (
+    'DROP INDEX IF EXISTS title_name_trgm_idx',
+    'DROP INDEX IF EXISTS title_search_vector_idx',
+    'DROP TRIGGER IF EXISTS reviews_title_search_vector_trigger '
+    'ON reviews_title',
+    'DROP FUNCTION IF EXISTS reviews_title_search_vector_update()',
+)
+# Триграммный индекс ускоряет фильтр name (ILIKE '%...%').
+POSTGRESQL_TRIGRAM = (
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    'CREATE INDEX title_name_trgm_idx ON reviews_title '
+    'USING gin (name gin_trgm_ops)',
+)
+
+SQLITE_FORWARD = (
+    '''
+    CREATE VIRTUAL TABLE reviews_title_fts USING fts5(
+        name, description, content='reviews_title', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'
+    )
+    ''',
+    '''
+    INSERT INTO reviews_title_fts(reviews_title_fts, rank)
+    VALUES ('rank', 'bm25(10.0, 1.0)')
+    ''',
+    '''
+    CREATE TRIGGER reviews_title_fts_insert AFTER INSERT ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    ''',
+    '''
+    CREATE TRIGGER reviews_title_fts_delete AFTER DELETE ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(
+            reviews_title_fts, rowid, name, description
+        ) VALUES ('delete', old.id, old.name, old.description);
+    END
+    ''',
+    '''
+    CREATE TRIGGER reviews_title_fts_update
+    AFTER UPDATE OF name, description ON reviews_title
+    BEGIN
+        INSERT INTO reviews_title_fts(
+            reviews_title_fts, rowid, name, description
+        ) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO reviews_title_fts(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    ''',
+    "INSERT INTO reviews_title_fts(reviews_title_fts) VALUES ('rebuild')",
+)
+SQLITE_BACKWARD = (
+    'DROP TRIGGER IF EXISTS reviews_title_fts_insert',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_delete',
+    'DROP TRIGGER IF EXISTS reviews_title_fts_update',
+    'DROP TABLE IF EXISTS reviews_title_fts',
+)
+
+
+def execute(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        execute(schema_editor, POSTGRESQL_FORWARD)
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'"
+            )
+            if cursor.fetchone():
+                execute(schema_editor, POSTGRESQL_TRIGRAM)
+    elif vendor == 'sqlite':
+        execute(schema_editor, SQLITE_FORWARD)
+
+
+def drop_search(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        execute(schema_editor, POSTGRESQL_BACKWARD)
+    elif vendor == 'sqlite':
+        execute(schema_editor, SQLITE_BACKWARD)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_pub_date_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search, drop_search),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Leaderboard',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('top', 'Лучшие по байесовской оценке'), ('trending', 'Больше всего свежих отзывов')], max_length=16, verbose_name='Рейтинг')),
+                ('scope', models.CharField(choices=[('category', 'Категория'), ('genre', 'Жанр')], max_length=16, verbose_name='Раздел')),
+                ('scope_id', models.PositiveIntegerField(verbose_name='id раздела')),
+                ('score', models.FloatField(verbose_name='Балл')),
+                ('title', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboards', to='reviews.Title', verbose_name='произведение')),
+            ],
+            options={
+                'verbose_name': 'Место в рейтинге',
+                'verbose_name_plural': 'Рейтинги',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='leaderboard',
+            index=models.Index(fields=['board', 'scope', 'scope_id', '-score', 'title'], name='leaderboard_rank_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaderboard',
+            constraint=models.UniqueConstraint(fields=('board', 'scope', 'scope_id', 'title'), name='unique_leaderboard_title'),
+        ),
+    ]
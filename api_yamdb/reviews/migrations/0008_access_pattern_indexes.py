@@ -0,0 +1,39 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:47
+
+from django.db import migrations, models
+
+# Таблица связей создана ManyToManyField, индекс к ней - только SQL.
+# Полусоединение фильтра genre читает пары (genre_id, title_id) из
+# индекса, не обращаясь к таблице.
+TITLE_GENRE_INDEX = (
+    'CREATE INDEX title_genre_genre_title_idx '
+    'ON reviews_title_genre (genre_id, title_id)'
+)
+DROP_TITLE_GENRE_INDEX = 'DROP INDEX title_genre_genre_title_idx'
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_leaderboard'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['reviews', 'id'], name='comment_review_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['title', 'id'], name='review_title_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(condition=models.Q(category__isnull=False), fields=['category', 'year', 'name'], name='title_category_year_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', 'name'], name='title_year_name_idx'),
+        ),
+        migrations.RunSQL(TITLE_GENRE_INDEX, DROP_TITLE_GENRE_INDEX),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 20:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardMean',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mean', models.FloatField(verbose_name='Средняя оценка')),
+                ('computed', models.DateTimeField(auto_now=True, verbose_name='Дата расчёта')),
+            ],
+            options={
+                'verbose_name': 'Средняя оценка рейтингов',
+                'verbose_name_plural': 'Средняя оценка рейтингов',
+            },
+        ),
+    ]
@@ -1,6 +1,12 @@
+import re
+
 from django.contrib.auth.models import AbstractUser
-from django.db import models
-from django.db.models import Q
+from django.contrib.postgres.search import (SearchQuery, SearchRank,
+                                            SearchVectorField)
+from django.db import connections, models
+from django.db.models import Case, Count, F, FloatField, Q, Sum, Value, When
+from django.db.models.functions import Cast
+from django.utils import timezone
 
 from .validators import score_validation, text_validation
 
@@ -96,6 +102,104 @@ class Genre(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+
+    def search(self, text):
+        """Полнотекстовый поиск по названию и описанию.
+
+        Последнее слово ищется по префиксу, чтобы поиск работал для
+        автодополнения. Результаты упорядочены по релевантности: на
+        PostgreSQL по индексу search_vector, на SQLite по таблице FTS5.
+        """
+        terms = re.findall(r'\w+', text)
+        if not terms:
+            return self
+        vendor = connections[self.db].vendor
+        if vendor == 'postgresql':
+            query = SearchQuery(
+                ' & '.join(terms) + ':*', config='simple', search_type='raw'
+            )
+            return self.filter(search_vector=query).annotate(
+                search_rank=SearchRank(F('search_vector'), query)
+            ).order_by('-search_rank', 'name')
+        if vendor == 'sqlite':
+            match = ' '.join(f'"{term}"' for term in terms) + '*'
+            return self.extra(
+                select={'search_rank': 'reviews_title_fts.rank'},
+                tables=('reviews_title_fts',),
+                where=('reviews_title_fts.rowid = reviews_title.id',
+                       'reviews_title_fts MATCH %s'),
+                params=(match,),
+            ).order_by('search_rank', 'name')
+        condition = Q()
+        for term in terms:
+            condition &= (Q(name__icontains=term)
+                          | Q(description__icontains=term))
+        return self.filter(condition)
+
+    def update_rating(self, score_delta, count_delta):
+        """Атомарно сдвигает сумму оценок и число отзывов."""
+        reviews_count = F('reviews_count') + count_delta
+        return self.update(
+            score_sum=F('score_sum') + score_delta,
+            reviews_count=reviews_count,
+            rating=Case(
+                When(Q(reviews_count__lte=-count_delta), then=Value(None)),
+                default=(Cast(F('score_sum') + score_delta, FloatField())
+                         / reviews_count),
+                output_field=FloatField(),
+            ),
+            modified=timezone.now(),
+        )
+
+    def touch(self):
+        """Отмечает произведения изменёнными, например после правки жанра."""
+        return self.update(modified=timezone.now())
+
+    def rebuild_ratings(self, chunk_size=1000):
+        """Пересчитывает сохранённый рейтинг пачками по chunk_size.
+
+        Перезаписываются только произведения, у которых рейтинг разошёлся
+        с отзывами: у остальных modified и с ним ETag и Last-Modified
+        не меняются. Возвращает число исправленных произведений.
+        """
+        fixed = 0
+        last_pk = 0
+        while True:
+            titles = list(
+                self.filter(pk__gt=last_pk).order_by('pk')
+                .only('pk', 'score_sum', 'reviews_count', 'rating')
+                [:chunk_size]
+            )
+            if not titles:
+                return fixed
+            last_pk = titles[-1].pk
+            totals = {
+                row['title_id']: row
+                for row in Review.objects.filter(
+                    title_id__in=[title.pk for title in titles]
+                ).order_by().values('title_id').annotate(
+                    total=Sum('score'), count=Count('id')
+                )
+            }
+            changed = []
+            for title in titles:
+                row = totals.get(title.pk, {'total': 0, 'count': 0})
+                rating = row['total'] / row['count'] if row['count'] else None
+                if (title.score_sum, title.reviews_count, title.rating) == (
+                        row['total'], row['count'], rating):
+                    continue
+                title.score_sum = row['total']
+                title.reviews_count = row['count']
+                title.rating = rating
+                title.modified = timezone.now()
+                changed.append(title)
+            Title.objects.bulk_update(
+                changed, ('score_sum', 'reviews_count', 'rating', 'modified')
+            )
+            fixed += len(changed)
+
+
 class Title(models.Model):
     name = models.CharField(
         max_length=256, db_index=True,
@@ -118,17 +222,46 @@ class Title(models.Model):
         Genre, verbose_name='Жанр',
         related_name='titles', blank=True
     )
-    rating = models.IntegerField(
+    rating = models.FloatField(
         verbose_name='Оценка',
         validators=[score_validation],
         null=True,
         default=None
     )
+    score_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0
+    )
+    reviews_count = models.PositiveIntegerField(
+        verbose_name='Количество отзывов',
+        default=0
+    )
+    modified = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+        db_index=True
+    )
+    # Заполняется триггером БД на PostgreSQL, см. миграцию title_search.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
         ordering = ('name',)
+        # Фильтры category и year со страницей в порядке name. Без
+        # категории произведения под фильтр category не попадают.
+        indexes = (
+            models.Index(
+                fields=('category', 'year', 'name'),
+                name='title_category_year_name_idx',
+                condition=Q(category__isnull=False)
+            ),
+            models.Index(
+                fields=('year', 'name'), name='title_year_name_idx'
+            ),
+        )
 
     def __str__(self):
         return self.name
@@ -167,6 +300,14 @@ class Review(models.Model):
                 fields=('author', 'title',),
                 name='unique_subscribers'),
         )
+        indexes = (
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_idx'
+            ),
+            # Страницы отзывов произведения в порядке id.
+            models.Index(fields=('title', 'id'), name='review_title_id_idx'),
+        )
         ordering = ('id',)
 
 
@@ -193,4 +334,74 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('reviews', 'pub_date', 'id'),
+                name='comment_review_pub_date_idx'
+            ),
+            models.Index(
+                fields=('reviews', 'id'), name='comment_review_id_idx'
+            ),
+        )
         ordering = ('id',)
+
+
+class Leaderboard(models.Model):
+    """Балл произведения в рейтинге категории или жанра.
+
+    Строки пересчитывает reviews.leaderboards; чтение рейтинга - один
+    проход по индексу leaderboard_rank_idx.
+    """
+    TOP = 'top'
+    TRENDING = 'trending'
+    BOARD_CHOICES = [
+        (TOP, 'Лучшие по байесовской оценке'),
+        (TRENDING, 'Больше всего свежих отзывов'),
+    ]
+    CATEGORY = 'category'
+    GENRE = 'genre'
+    SCOPE_CHOICES = [
+        (CATEGORY, 'Категория'),
+        (GENRE, 'Жанр'),
+    ]
+    board = models.CharField('Рейтинг', max_length=16, choices=BOARD_CHOICES)
+    scope = models.CharField('Раздел', max_length=16, choices=SCOPE_CHOICES)
+    # id категории или жанра; строки удалённых разделов чистит сигнал.
+    scope_id = models.PositiveIntegerField('id раздела')
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE,
+        related_name='leaderboards',
+        verbose_name='произведение',
+    )
+    score = models.FloatField('Балл')
+
+    class Meta:
+        verbose_name = 'Место в рейтинге'
+        verbose_name_plural = 'Рейтинги'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('board', 'scope', 'scope_id', 'title'),
+                name='unique_leaderboard_title'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('board', 'scope', 'scope_id', '-score', 'title'),
+                name='leaderboard_rank_idx'
+            ),
+        )
+
+
+class LeaderboardMean(models.Model):
+    """Средняя оценка последней пересборки рейтингов; одна строка.
+
+    Хранится в БД, чтобы веб-сервер, run_workers и команды считали
+    байесовские баллы от одного и того же среднего.
+    """
+    SINGLETON_ID = 1
+    mean = models.FloatField('Средняя оценка')
+    computed = models.DateTimeField('Дата расчёта', auto_now=True)
+
+    class Meta:
+        verbose_name = 'Средняя оценка рейтингов'
+        verbose_name_plural = 'Средняя оценка рейтингов'
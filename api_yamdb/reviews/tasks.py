@@ -0,0 +1,13 @@
+from api.signals import bump_on_commit
+from django.db import transaction
+from jobs.queue import handler
+
+from .leaderboards import refresh_leaderboards
+
+
+@handler('refresh_leaderboards')
+def refresh_title_leaderboards(payload):
+    with transaction.atomic():
+        refresh_leaderboards(payload['title_ids'])
+        # Закэшированные рейтинги собраны до пересчёта.
+        bump_on_commit('titles')
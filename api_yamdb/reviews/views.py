@@ -1,16 +1,32 @@
+from collections import defaultdict
+
+from api.batch import BatchCreateMixin, raw_values, save_all
+from api.cache import CachedRetrieveMixin, ResponseCacheMixin
+from api.conditional import ConditionalGetMixin, version_validators
 from api.filters import TitleFilter
+from api.nested import NestedParentMixin
+from api.pagination import OptionalCursorPagination, Pagination
 from api.permissions import IsAdminOrReadOnly, UserPermission
-from api.serializers import (CategorySerializer, CommentSerializer,
-                             GenreSerializer, ReviewSerializer,
+from api.rows import RowListMixin
+from api.serializers import (ONE_REVIEW_MESSAGE, CategorySerializer,
+                             CommentSerializer, GenreSerializer,
+                             LeaderboardSerializer, ReviewBatchSerializer,
+                             ReviewSerializer, TitleBatchSerializer,
                              TitleCreateSerializer, TitleSerializer)
+from api.signals import bump_on_commit
+from api.sparse import SparseQuerysetMixin
+from api.throttling import CreateThrottleMixin
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, viewsets
+from rest_framework.decorators import action
 from rest_framework.mixins import (CreateModelMixin, DestroyModelMixin,
                                    ListModelMixin)
 from rest_framework.pagination import PageNumberPagination
 
-from .models import Category, Genre, Review, Title
+from .leaderboards import schedule_refresh
+from .models import Category, Genre, Leaderboard, Review, Title
 
 
 class CustomMixin(ListModelMixin, CreateModelMixin,
@@ -18,8 +34,9 @@ class CustomMixin(ListModelMixin, CreateModelMixin,
     pass
 
 
-class CategoryViewSet(CustomMixin):
+class CategoryViewSet(ResponseCacheMixin, CustomMixin):
     """API для категорий."""
+    cache_resource = 'categories'
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = PageNumberPagination
     queryset = Category.objects.all()
@@ -29,8 +46,9 @@ class CategoryViewSet(CustomMixin):
     lookup_field = 'slug'
 
 
-class GenreViewSet(CustomMixin):
+class GenreViewSet(ResponseCacheMixin, CustomMixin):
     """API для жанров."""
+    cache_resource = 'genres'
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = PageNumberPagination
     queryset = Genre.objects.all()
@@ -40,49 +58,204 @@ class GenreViewSet(CustomMixin):
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(SparseQuerysetMixin, BatchCreateMixin, ConditionalGetMixin,
+                   CachedRetrieveMixin, RowListMixin, viewsets.ModelViewSet):
     """API для произведений."""
+    cache_resource = 'titles'
     permission_classes = (IsAdminOrReadOnly,)
-    pagination_class = PageNumberPagination
-    queryset = Title.objects.all()
+    pagination_class = Pagination
     serializer_class = TitleSerializer
+    batch_serializer_class = TitleBatchSerializer
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
     ordering_fields = ('name',)
     ordering = ('name',)
+    select_fields = ('category',)
+    prefetch_fields = ('genre',)
+
+    def get_queryset(self):
+        # Рейтинг хранится в самом произведении, связи грузятся пачкой:
+        # страница стоит одинаковое число запросов при любом размере.
+        # С ?fields= или ?omit= грузятся только нужные поля и связи.
+        return self.sparse_queryset(Title.objects.all())
+
+    def get_validators(self):
+        if self.action == 'list':
+            return version_validators('titles')
+        try:
+            modified = Title.objects.filter(
+                pk=self.kwargs['pk']
+            ).values_list('modified', flat=True).first()
+        except ValueError:
+            return None
+        if modified is None:
+            return None
+        return modified.isoformat(), modified.timestamp()
 
     def get_serializer_class(self):
         if self.action in ('create', 'partial_update'):
             return TitleCreateSerializer
         return TitleSerializer
 
+    @action(detail=False, methods=('post',))
+    def batch(self, request, *args, **kwargs):
+        return super().batch(request, *args, **kwargs)
 
-class ReviewViewSet(viewsets.ModelViewSet):
+    def get_batch_context(self, items):
+        return {
+            'categories': Category.objects.in_bulk(
+                raw_values(items, 'category'), field_name='slug'
+            ),
+            'genres': Genre.objects.in_bulk(
+                raw_values(items, 'genre'), field_name='slug'
+            ),
+        }
+
+    def perform_batch_create(self, validated):
+        genres = [data.pop('genre') for data in validated]
+        titles = [Title(**data) for data in validated]
+        save_all(Title, titles)
+        Title.genre.through.objects.bulk_create(
+            Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+            for title, title_genres in zip(titles, genres)
+            for genre in title_genres
+        )
+        bump_on_commit('titles')
+        created = self.get_queryset().in_bulk([title.pk for title in titles])
+        return TitleCreateSerializer(
+            [created[title.pk] for title in titles], many=True
+        ).data
+
+
+class ReviewViewSet(SparseQuerysetMixin, NestedParentMixin,
+                    CreateThrottleMixin, BatchCreateMixin,
+                    ConditionalGetMixin, RowListMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
+    batch_serializer_class = ReviewBatchSerializer
     permission_classes = (UserPermission,)
+    pagination_class = OptionalCursorPagination
+    # Самого произведения не нужно: только проверка, что оно есть.
+    parent_queryset = Title.objects.only('id')
+    parent_lookups = {'pk': 'title_id'}
+    select_fields = ('author',)
+    # Курсор пагинации берёт позицию из строки.
+    row_columns = ('pub_date',)
+
+    def get_validators(self):
+        return version_validators(f'reviews:{self.kwargs["title_id"]}')
 
     def get_queryset(self):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        return title.reviews.all()
+        return self.sparse_queryset(self.parent.reviews.all())
 
+    @transaction.atomic
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get('title_id'))
-        serializer.save(author=self.request.user, title=title)
-        serializer.is_valid(raise_exception=True)
+        # Второй отзыв автора отклоняет индекс unique_subscribers.
+        self.save_unique(
+            serializer, ONE_REVIEW_MESSAGE,
+            author=self.request.user, title=self.parent
+        )
+        Title.objects.filter(pk=self.parent.pk).update_rating(
+            serializer.instance.score, 1
+        )
+        schedule_refresh([self.parent.pk])
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        old_score = Review.objects.select_for_update().values_list(
+            'score', flat=True
+        ).get(pk=serializer.instance.pk)
+        serializer.save()
+        Title.objects.filter(pk=serializer.instance.title_id).update_rating(
+            serializer.instance.score - old_score, 0
+        )
+        schedule_refresh([serializer.instance.title_id])
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        Title.objects.filter(pk=instance.title_id).update_rating(
+            -instance.score, -1
+        )
+        schedule_refresh([instance.title_id])
 
-class CommentViewSet(viewsets.ModelViewSet):
+    def get_batch_context(self, items):
+        title_ids = {
+            int(value) for value in raw_values(items, 'title')
+            if str(value).isdigit()
+        }
+        return {
+            'titles': set(Title.objects.filter(
+                pk__in=title_ids
+            ).values_list('pk', flat=True)),
+            'reviewed': set(self.request.user.reviews_author.filter(
+                title_id__in=title_ids
+            ).values_list('title_id', flat=True)),
+        }
+
+    def perform_batch_create(self, validated):
+        reviews = [
+            Review(
+                author=self.request.user, title_id=data['title'],
+                text=data['text'], score=data['score']
+            )
+            for data in validated
+        ]
+        save_all(Review, reviews)
+        # Отзывы с одинаковой оценкой сдвигают рейтинг одним UPDATE.
+        titles_by_score = defaultdict(list)
+        for review in reviews:
+            titles_by_score[review.score].append(review.title_id)
+        for score, title_ids in titles_by_score.items():
+            Title.objects.filter(pk__in=title_ids).update_rating(score, 1)
+        schedule_refresh({review.title_id for review in reviews})
+        bump_on_commit('titles', *{
+            f'reviews:{review.title_id}' for review in reviews
+        })
+        return ReviewSerializer(reviews, many=True).data
+
+
+class CommentViewSet(SparseQuerysetMixin, NestedParentMixin,
+                     CreateThrottleMixin, ConditionalGetMixin, RowListMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (UserPermission,)
+    pagination_class = OptionalCursorPagination
+    parent_queryset = Review.objects.only('id', 'title_id')
+    parent_lookups = {'title_id': 'title_id', 'pk': 'review_id'}
+    select_fields = ('author',)
+    # Курсор пагинации берёт позицию из строки.
+    row_columns = ('pub_date',)
+
+    def get_validators(self):
+        return version_validators(f'comments:{self.kwargs["review_id"]}')
 
     def get_queryset(self):
-        review = get_object_or_404(Review,
-                                   title_id=self.kwargs.get('title_id'),
-                                   id=self.kwargs.get('review_id'))
-        return review.comments.all()
+        return self.sparse_queryset(self.parent.comments.all())
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review,
-                                   title_id=self.kwargs.get('title_id'),
-                                   id=self.kwargs.get('review_id'))
-        serializer.save(author=self.request.user, reviews=review)
+        serializer.save(author=self.request.user, reviews=self.parent)
+
+
+class LeaderboardViewSet(ResponseCacheMixin, ListModelMixin,
+                         viewsets.GenericViewSet):
+    """Рейтинг произведений категории или жанра, см. reviews.leaderboards."""
+    # Рейтинг меняется вместе с произведениями и отзывами.
+    cache_resource = 'titles'
+    pagination_class = PageNumberPagination
+    serializer_class = LeaderboardSerializer
+    scope_models = {
+        Leaderboard.CATEGORY: Category,
+        Leaderboard.GENRE: Genre,
+    }
+
+    def get_queryset(self):
+        scope = self.kwargs['scope']
+        scope_id = get_object_or_404(
+            self.scope_models[scope].objects.only('id'),
+            slug=self.kwargs['slug']
+        ).pk
+        return Leaderboard.objects.filter(
+            board=self.kwargs['board'], scope=scope, scope_id=scope_id
+        ).order_by('-score', 'title_id').select_related(
+            'title__category'
+        ).prefetch_related('title__genre')